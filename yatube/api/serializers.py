@@ -0,0 +1,46 @@
+from django.core.files.storage import default_storage
+
+from posts.models import Post
+
+POST_VALUES = (
+    'pk', 'text', 'pub_date', 'author__username', 'group__slug',
+    'image', 'image_thumbnail', 'image_sources', 'image_status',
+    'comments_count',
+)
+COMMENT_VALUES = ('pk', 'text', 'created', 'author__username')
+
+
+def post_row(row):
+    """Словарь из values(POST_VALUES) в представление поста для API."""
+    return {
+        'id': row['pk'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'author': row['author__username'],
+        'group': row['group__slug'],
+        'image': _image_url(row),
+        'image_sources': [
+            {'type': mime, 'srcset': srcset}
+            for mime, srcset in Post.parse_image_sources(row['image_sources'])
+        ],
+        'image_status': row['image_status'] or None,
+        'comments_count': row['comments_count'],
+    }
+
+
+def comment_row(row):
+    return {
+        'id': row['pk'],
+        'text': row['text'],
+        'created': row['created'],
+        'author': row['author__username'],
+    }
+
+
+def _image_url(row):
+    if row['image_thumbnail']:
+        return row['image_thumbnail']
+    # Пока с исходника не снят EXIF, его не отдаём.
+    if row['image'] and row['image_status'] != Post.IMAGE_PROCESSING:
+        return default_storage.url(row['image'])
+    return None
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts.feeds import POST
+from posts.generations import generation_key
+from posts.models import Comment, Group, Post, User
+
+INDEX = reverse('api:index')
+GROUP = reverse('api:group', args=['slug'])
+PROFILE = reverse('api:profile', args=['auth'])
+MISSING_GROUP = reverse('api:group', args=['missing'])
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='auth')
+        cls.group = Group.objects.create(
+            title='group', slug='slug', description='description'
+        )
+        cls.posts = [
+            Post.objects.create(author=cls.user, group=cls.group, text=text)
+            for text in ('first', 'second', 'third')
+        ]
+        cls.post = cls.posts[-1]
+        cls.POST_DETAIL = reverse('api:post_detail', args=[cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds(self):
+        """Ленты отдаются в JSON от новых постов к старым."""
+        for url in (INDEX, GROUP, PROFILE):
+            with self.subTest(url=url):
+                data = self.client.get(url).json()
+                self.assertEqual(data['count'], 3)
+                self.assertEqual(
+                    [post['id'] for post in data['results']],
+                    [post.pk for post in reversed(self.posts)],
+                )
+                self.assertEqual(data['results'][0]['author'], 'auth')
+                self.assertEqual(data['results'][0]['group'], 'slug')
+        self.assertEqual(self.client.get(MISSING_GROUP).status_code, 404)
+
+    @override_settings(POSTS_ON_PAGE=2)
+    def test_cursor_pagination(self):
+        """Следующая страница берётся по ссылке next."""
+        data = self.client.get(INDEX).json()
+        self.assertIsNone(data['previous'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual(
+            [post['id'] for post in data['results']], [self.posts[0].pk]
+        )
+        self.assertIsNone(data['next'])
+        self.assertTrue(data['previous'])
+
+    def test_not_modified(self):
+        """Неизменная лента отдаёт 304, не обращаясь к базе."""
+        response = self.client.get(INDEX)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(INDEX, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                INDEX, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.user, text='new')
+        response = self.client.get(INDEX, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_post_detail(self):
+        """Пост отдаётся с комментариями, новый комментарий меняет ETag."""
+        data = self.client.get(self.POST_DETAIL).json()
+        self.assertEqual(data['post']['text'], 'third')
+        self.assertEqual(data['comments']['results'], [])
+        etag = self.client.get(self.POST_DETAIL)['ETag']
+        Comment.objects.create(post=self.post, author=self.user, text='hi')
+        response = self.client.get(self.POST_DETAIL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['comments']['results'][0]['text'], 'hi'
+        )
+
+    def test_missing_post_leaves_no_cache_keys(self):
+        """Запрос несуществующего поста не оставляет ключей в кэше."""
+        missing = reverse('api:post_detail', args=[self.post.pk + 100])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+        self.assertIsNone(
+            cache.get(generation_key(POST, self.post.pk + 100))
+        )
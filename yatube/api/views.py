@@ -0,0 +1,129 @@
+from functools import partial
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import condition, require_safe
+
+from posts.conditional import (
+    feed_etag, feed_last_modified, post_last_modified,
+)
+from posts.counters import feed_count
+from posts.feeds import AUTHOR, GROUP, INDEX, POST, feed_queryset
+from posts.models import Comment, Group, Post, User
+from posts.paginators import KeysetPaginator
+
+from .serializers import COMMENT_VALUES, POST_VALUES, comment_row, post_row
+
+
+def index_feed():
+    return INDEX, None
+
+
+def group_feed(slug):
+    owner = Group.objects.filter(slug=slug).values_list('pk', flat=True)
+    return (GROUP, owner[0]) if owner else None
+
+
+def author_feed(username):
+    owner = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    )
+    return (AUTHOR, owner[0]) if owner else None
+
+
+def post_etag(request, post_id):
+    # Для несуществующего поста поколение не заводится: иначе перебор id
+    # копил бы в кэше бессрочные ключи.
+    if not Post.objects.filter(pk=post_id).exists():
+        return None
+    return feed_etag(request, POST, post_id)
+
+
+def post_detail_last_modified(request, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        return None
+    return post_last_modified(post_id)
+
+
+def feed_condition(resolve):
+    """
+    condition() для ленты, которую resolve находит по аргументам адреса:
+    ETag по поколению ленты и курсору, Last-Modified по последнему посту.
+    """
+    def etag(request, **kwargs):
+        feed = resolve(**kwargs)
+        return feed and feed_etag(request, *feed)
+
+    def last_modified(request, **kwargs):
+        feed = resolve(**kwargs)
+        return feed and feed_last_modified(*feed)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def page_json(request, queryset, serialize, key='pub_date', count=None):
+    paginator = KeysetPaginator(
+        queryset, settings.POSTS_ON_PAGE, key=key, count=count
+    )
+    cursor = request.GET.get('cursor')
+    page = paginator.get_cursor_page(cursor) if cursor else paginator.page(1)
+    return {
+        'count': paginator.count,
+        'next': _cursor_url(request, page.next_cursor),
+        'previous': _cursor_url(request, page.previous_cursor),
+        'results': [serialize(row) for row in page],
+    }
+
+
+def _cursor_url(request, cursor):
+    if cursor is None:
+        return None
+    return request.build_absolute_uri(f'{request.path}?cursor={cursor}')
+
+
+def feed_json(request, feed, owner=None):
+    return JsonResponse(page_json(
+        request, feed_queryset(feed, owner).values(*POST_VALUES), post_row,
+        count=partial(feed_count, feed, owner),
+    ))
+
+
+@require_safe
+@feed_condition(index_feed)
+def index(request):
+    return feed_json(request, INDEX)
+
+
+@require_safe
+@feed_condition(group_feed)
+def group_posts(request, slug):
+    feed = group_feed(slug)
+    if feed is None:
+        raise Http404
+    return feed_json(request, *feed)
+
+
+@require_safe
+@feed_condition(author_feed)
+def profile(request, username):
+    feed = author_feed(username)
+    if feed is None:
+        raise Http404
+    return feed_json(request, *feed)
+
+
+@require_safe
+@condition(
+    etag_func=post_etag, last_modified_func=post_detail_last_modified
+)
+def post_detail(request, post_id):
+    post = feed_queryset().filter(pk=post_id).values(*POST_VALUES).first()
+    if post is None:
+        raise Http404
+    comments = Comment.objects.filter(post_id=post_id).values(*COMMENT_VALUES)
+    return JsonResponse({
+        'post': post_row(post),
+        'comments': page_json(
+            request, comments, comment_row, key='created'
+        ),
+    })
@@ -0,0 +1,53 @@
+from urllib.parse import parse_qsl, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'pylibmc': 'django.core.cache.backends.memcached.PyLibMCCache',
+    'redis': 'django_redis.cache.RedisCache',
+}
+
+
+def cache_from_url(url, key_prefix=''):
+    """
+    Собирает настройки кэша из строки вида:
+
+        locmem://                   кэш внутри процесса
+        file:///var/tmp/yatube      общий для процессов, без сервисов
+        db://yatube_cache           таблица в БД (manage.py createcachetable)
+        memcached://host:11211,host2:11211
+        redis://host:6379/1         нужен пакет django-redis
+
+    Параметр ?timeout= задаёт TIMEOUT, остальные уходят в OPTIONS.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in BACKENDS:
+        raise ImproperlyConfigured(f'Неизвестный бэкенд кэша: {url}')
+    if parts.scheme == 'file':
+        location = parts.path
+    elif parts.scheme == 'db':
+        location = parts.netloc or parts.path.lstrip('/')
+    elif parts.scheme in ('memcached', 'pylibmc'):
+        location = parts.netloc.split(',')
+    elif parts.scheme == 'redis':
+        location = url.split('?')[0]
+    else:
+        location = parts.netloc
+    config = {
+        'BACKEND': BACKENDS[parts.scheme],
+        'LOCATION': location,
+        'KEY_PREFIX': key_prefix,
+    }
+    options = {
+        name.upper(): int(value) if value.isdigit() else value
+        for name, value in parse_qsl(parts.query)
+    }
+    if 'TIMEOUT' in options:
+        config['TIMEOUT'] = options.pop('TIMEOUT')
+    if options:
+        config['OPTIONS'] = options
+    return config
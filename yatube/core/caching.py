@@ -0,0 +1,133 @@
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .replicas import reading_replica
+
+STATS_KEY = 'cache_stats:{}:{}'
+LOCK_KEY = '{}:lock'
+# Кэши со счётчиками попаданий. Список постоянный, чтобы не держать
+# реестр имён в общем кэше; {% fragment_cache %} принимает только их.
+CACHE_NAMES = (
+    'default', 'page', 'feed_modified', 'feed_page', 'comments_page',
+)
+
+
+def get_or_compute(key, compute, timeout, name='default'):
+    """
+    Значение из кэша с защитой от лавины пересчётов.
+
+    Рядом со значением хранятся время его расчёта и срок жизни. Перед
+    истечением срока один из запросов пересчитывает значение заранее
+    (вероятностный early recompute) под блокировкой, остальные отдают
+    старое. При полном промахе конкуренты ждут того, кто взял блокировку;
+    не дождавшись, считают сами, но чужую блокировку не снимают.
+
+    Запрос, который читает из реплики, кэш не заполняет (см.
+    replicas.primary): промах считается без записи.
+    """
+    entry = cache.get(key)
+    replica = reading_replica()
+    token = uuid.uuid4().hex
+    if entry is not None:
+        value, duration, expires = entry
+        if (
+            replica
+            or not _recompute_early(duration, expires)
+            or not _lock(key, token)
+        ):
+            record(name, 'hits')
+            return value
+    elif replica:
+        record(name, 'misses')
+        return compute()
+    elif not _lock(key, token):
+        entry = _wait(key, token)
+        if entry is not None:
+            record(name, 'hits')
+            return entry[0]
+    record(name, 'misses')
+    try:
+        started = time.monotonic()
+        value = compute()
+        duration = time.monotonic() - started
+        cache.set(key, (value, duration, time.time() + timeout), timeout)
+    finally:
+        _unlock(key, token)
+    return value
+
+
+def _recompute_early(duration, expires):
+    beta = settings.CACHE_EARLY_RECOMPUTE_BETA
+    return (
+        time.time() - duration * beta * math.log(1 - random.random())
+        >= expires
+    )
+
+
+def _lock(key, token):
+    """Берёт блокировку; в ней лежит token того, кто её держит."""
+    return cache.add(
+        LOCK_KEY.format(key), token, settings.CACHE_LOCK_TIMEOUT
+    )
+
+
+def _unlock(key, token):
+    """Снимает блокировку, только если её держит token."""
+    lock = LOCK_KEY.format(key)
+    if cache.get(lock) == token:
+        cache.delete(lock)
+
+
+def _wait(key, token):
+    """
+    Ждёт значение, пока держится блокировка. Если её отпустили без
+    значения (compute() упал), блокировку с token берёт ожидающий и
+    возвращает None - значение он посчитает сам. По истечении
+    CACHE_LOCK_TIMEOUT тоже возвращает None, не трогая блокировку.
+    """
+    lock = LOCK_KEY.format(key)
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        found = cache.get_many([key, lock])
+        if key in found:
+            return found[key]
+        if lock not in found and _lock(key, token):
+            return None
+    return None
+
+
+def record(name, kind):
+    """
+    Увеличивает общий для всех процессов счётчик попаданий/промахов:
+    обычно один incr, счётчик создаётся только при первом обращении.
+    """
+    key = STATS_KEY.format(name, kind)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def stats():
+    counters = cache.get_many(
+        [STATS_KEY.format(name, kind)
+         for name in CACHE_NAMES for kind in ('hits', 'misses')]
+    )
+    result = {}
+    for name in CACHE_NAMES:
+        hits = counters.get(STATS_KEY.format(name, 'hits'), 0)
+        misses = counters.get(STATS_KEY.format(name, 'misses'), 0)
+        result[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 3)
+            if hits + misses else None,
+        }
+    return result
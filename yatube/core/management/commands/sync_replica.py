@@ -0,0 +1,31 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в локальные реплики из '
+        'DATABASE_REPLICAS; запуск по расписанию имитирует отставание.'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('DATABASE_REPLICAS пуст: задайте '
+                               'DATABASE_REPLICA_NAME')
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('Копировать можно только SQLite; настоящие '
+                               'реплики получают данные репликацией СУБД.')
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            replica.close()
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f'{alias}: скопирована основная база')
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from .caching import get_or_compute
+from .replicas import primary
+
+PAGE_KEY = 'page:{}'
+HOLE = '<!--hole:{}-->'
+HOLE_RE = re.compile(r'<!--hole:(.*?)-->')
+
+
+class Uncacheable(Exception):
+    """Ответ представления нельзя положить в общий кэш страниц."""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def page_cache(version_func):
+    """
+    Кэширует страницу целиком, одну на всех пользователей.
+
+    version_func(request, *args, **kwargs) возвращает версию данных
+    страницы (для лент - их поколения, которые сдвигают сигналы постов и
+    комментариев) или None, если страницу кэшировать не нужно. Всё, что
+    зависит от пользователя, шаблоны выводят через {% hole %}: в кэш
+    попадает метка, а на каждый запрос по ней рендерится маленький шаблон.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            version = version_func(request, *args, **kwargs)
+            if version is None:
+                return view(request, *args, **kwargs)
+
+            def compute():
+                request.punch_holes = True
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200 or response.cookies:
+                    raise Uncacheable(response)
+                return response.content, response['Content-Type']
+
+            key = hashlib.md5(
+                f'{request.get_full_path()}:{version}'.encode()
+            ).hexdigest()
+            try:
+                # Промах рендерит страницу по основной базе: общую страницу
+                # со свежим поколением нельзя собирать с отстающей реплики.
+                with primary():
+                    content, content_type = get_or_compute(
+                        PAGE_KEY.format(key), compute,
+                        settings.PAGE_CACHE_TIMEOUT, name='page',
+                    )
+            except Uncacheable as error:
+                response = error.response
+                response.content = fill_holes(request, response.content)
+                return response
+            return HttpResponse(
+                fill_holes(request, content), content_type=content_type
+            )
+        return wrapper
+    return decorator
+
+
+def hole(template_name, **context):
+    """Метка на месте шаблона, который рендерится на каждый запрос."""
+    return HOLE.format(json.dumps([template_name, context]))
+
+
+def fill_holes(request, content):
+    """Рендерит шаблоны на месте меток для текущего пользователя."""
+    def render(match):
+        template_name, context = json.loads(match.group(1))
+        return render_to_string(template_name, context, request)
+    return HOLE_RE.sub(render, content.decode()).encode()
@@ -0,0 +1,110 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+# Реплика, из которой читает текущий запрос; None - читаем из default.
+_replica = ContextVar('replica', default=None)
+# Сессии и пользователи читаются из default: иначе только что вошедший
+# пользователь выглядел бы анонимом, пока вход не дойдёт до реплик.
+PRIMARY_APPS = ('auth', 'contenttypes', 'sessions')
+
+
+class ReplicaRouter:
+    """
+    Чтения внутри представлений с @read_replica идут в одну из
+    DATABASE_REPLICAS, кроме моделей PRIMARY_APPS; всё остальное - в
+    default.
+
+    Реплики получают схему и данные от основной базы, поэтому миграции
+    на них не запускаются.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS:
+            return None
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def reading_replica():
+    """Текущий запрос читает из реплики."""
+    return _replica.get() is not None
+
+
+@contextmanager
+def primary():
+    """
+    Чтения внутри блока идут в default и под @read_replica. Так читается
+    всё, что кладётся в кэш: ключи кэша завязаны на поколения лент, а их
+    сдвигает запись в основную базу, поэтому данные отстающей реплики
+    легли бы под свежий ключ устаревшими.
+    """
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def pinned(request):
+    """Пользователь недавно писал: его чтения должны видеть эту запись."""
+    return settings.REPLICA_PIN_COOKIE in request.COOKIES
+
+
+def read_replica(view):
+    """
+    Безопасные запросы к представлению читают из случайной реплики.
+
+    Пока у пользователя стоит кука после записи (см. pin_primary), он
+    читает из основной базы и видит свои изменения сразу, а не после
+    того, как они дойдут до реплик.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            not settings.DATABASE_REPLICAS
+            or request.method not in ('GET', 'HEAD')
+            or pinned(request)
+        ):
+            return view(request, *args, **kwargs)
+        token = _replica.set(random.choice(settings.DATABASE_REPLICAS))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+    return wrapper
+
+
+def pin_primary(view):
+    """
+    После записи (представление ответило перенаправлением) привязывает
+    пользователя к основной базе на REPLICA_PIN_SECONDS секунд.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if (
+            settings.DATABASE_REPLICAS
+            and request.user.is_authenticated
+            and response.status_code in (301, 302)
+        ):
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+    return wrapper
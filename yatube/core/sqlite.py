@@ -0,0 +1,33 @@
+from django.conf import settings
+
+# busy_timeout ставится первым: смене journal_mode тоже нужна блокировка.
+FIRST = ('busy_timeout',)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Выставляет SQLITE_PRAGMAS каждому новому соединению с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
+
+
+def apply_pragmas(cursor, pragmas):
+    """
+    Выполняет PRAGMA name = value для каждой пары; годится и курсор
+    Django, и курсор модуля sqlite3.
+    """
+    names = sorted(pragmas, key=lambda name: name not in FIRST)
+    for name in names:
+        if not name.replace('_', '').isalnum():
+            raise ValueError(f'Недопустимое имя PRAGMA: {name!r}')
+        cursor.execute(f'PRAGMA {name} = {_literal(pragmas[name])}')
+
+
+def _literal(value):
+    if isinstance(value, int):
+        return str(value)
+    value = str(value)
+    if not value.replace('_', '').isalnum():
+        raise ValueError(f'Недопустимое значение PRAGMA: {value!r}')
+    return value
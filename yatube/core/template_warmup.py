@@ -0,0 +1,33 @@
+import logging
+import os
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+def template_names(directory):
+    """Имена всех шаблонов каталога в том виде, в каком их ищет загрузчик."""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(('.html', '.txt')):
+                path = os.path.relpath(os.path.join(root, name), directory)
+                yield path.replace(os.sep, '/')
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны из TEMPLATES_DIR заранее, чтобы кэширующий
+    загрузчик был заполнен к первому запросу. Возвращает их число.
+    """
+    engine = engines['django']
+    count = 0
+    for name in template_names(settings.TEMPLATES_DIR):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError:
+            logger.exception('Шаблон %s не компилируется', name)
+        else:
+            count += 1
+    return count
@@ -0,0 +1,54 @@
+import hashlib
+
+from django import template
+from django.utils.safestring import mark_safe
+
+from core.caching import CACHE_NAMES, get_or_compute
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, name, key):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.name = name
+        self.key = key
+
+    def render(self, context):
+        key = hashlib.md5(
+            str(self.key.resolve(context)).encode()
+        ).hexdigest()
+        return mark_safe(get_or_compute(
+            f'template.fragment:{self.name}:{key}',
+            lambda: self.nodelist.render(context),
+            self.timeout.resolve(context),
+            name=self.name,
+        ))
+
+
+@register.tag
+def fragment_cache(parser, token):
+    """
+    {% fragment_cache timeout name key %}...{% endfragment_cache %}
+
+    Как {% cache %}, но с защитой от лавины пересчётов и счётчиками
+    попаданий для фрагмента name; name - одно из caching.CACHE_NAMES.
+    """
+    bits = token.split_contents()
+    if len(bits) != 4:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает таймаут, имя фрагмента и ключ'
+        )
+    if bits[2] not in CACHE_NAMES:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]}: неизвестное имя фрагмента {bits[2]}'
+        )
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        bits[2],
+        parser.compile_filter(bits[3]),
+    )
@@ -0,0 +1,23 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core.page_cache import hole as hole_marker
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name, **extra):
+    """
+    {% hole 'template.html' key=value %}
+
+    Как {% include %}, но на страницах из кэша page_cache шаблон
+    рендерится для каждого пользователя отдельно. Значения extra должны
+    сериализоваться в JSON.
+    """
+    request = context.get('request')
+    if getattr(request, 'punch_holes', False):
+        return mark_safe(hole_marker(template_name, **extra))
+    included = context.template.engine.get_template(template_name)
+    with context.push(**extra):
+        return included.render(context)
@@ -0,0 +1,15 @@
+from django import template
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/post_items.html')
+def post_item(post, hide_group=False, last=False):
+    """
+    {% post_item post hide_group=True last=forloop.last %}
+
+    Карточка поста в ленте. В отличие от {% include %} в цикле, шаблон
+    компилируется один раз на тег и рендерится в маленьком контексте
+    без всех переменных страницы.
+    """
+    return {'post': post, 'hide_group': hide_group, 'last': last}
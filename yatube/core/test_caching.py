@@ -0,0 +1,85 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from .cache_url import cache_from_url
+from .caching import LOCK_KEY, get_or_compute, stats
+
+CACHE_STATS = reverse('core:cache_stats')
+
+
+class CachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_from_url(self):
+        """Строка CACHE_URL превращается в настройки бэкенда."""
+        cases = [
+            ['locmem://', 'locmem.LocMemCache', ''],
+            ['file:///tmp/yatube', 'filebased.FileBasedCache', '/tmp/yatube'],
+            ['db://yatube_cache', 'db.DatabaseCache', 'yatube_cache'],
+            ['memcached://a:11211,b:11211', 'memcached.MemcachedCache',
+             ['a:11211', 'b:11211']],
+        ]
+        for url, backend, location in cases:
+            with self.subTest(url=url):
+                config = cache_from_url(url, key_prefix='test')
+                self.assertTrue(config['BACKEND'].endswith(backend))
+                self.assertEqual(config['LOCATION'], location)
+                self.assertEqual(config['KEY_PREFIX'], 'test')
+        config = cache_from_url('file:///tmp/y?timeout=60&max_entries=10')
+        self.assertEqual(config['TIMEOUT'], 60)
+        self.assertEqual(config['OPTIONS'], {'MAX_ENTRIES': 10})
+
+    def test_get_or_compute_counts_hits(self):
+        """Значение считается один раз, попадания и промахи учитываются."""
+        calls = []
+        for _ in range(3):
+            value = get_or_compute(
+                'key', lambda: calls.append(1) or 'value', 60, name='page'
+            )
+            self.assertEqual(value, 'value')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(stats()['page']['hits'], 2)
+        self.assertEqual(stats()['page']['misses'], 1)
+
+    @override_settings(CACHE_EARLY_RECOMPUTE_BETA=10 ** 12)
+    def test_get_or_compute_recomputes_early(self):
+        """Перед истечением срока значение пересчитывается заранее."""
+        get_or_compute('key', lambda: 'old', 60)
+        self.assertEqual(get_or_compute('key', lambda: 'new', 60), 'new')
+
+    @override_settings(CACHE_LOCK_TIMEOUT=10)
+    def test_waiters_stop_when_lock_released(self):
+        """Если держатель блокировки упал, ожидающий считает сам сразу."""
+        cache.add(LOCK_KEY.format('key'), True)
+        failed = threading.Timer(
+            0.1, cache.delete, args=[LOCK_KEY.format('key')]
+        )
+        failed.start()
+        started = time.monotonic()
+        self.assertEqual(get_or_compute('key', lambda: 'value', 60), 'value')
+        failed.join()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertIsNone(cache.get(LOCK_KEY.format('key')))
+
+    @override_settings(CACHE_LOCK_TIMEOUT=0.2)
+    def test_waiter_keeps_foreign_lock(self):
+        """Не дождавшись, запрос считает сам и не снимает чужую блокировку."""
+        cache.set(LOCK_KEY.format('key'), 'other', 60)
+        self.assertEqual(get_or_compute('key', lambda: 'value', 60), 'value')
+        self.assertEqual(cache.get(LOCK_KEY.format('key')), 'other')
+
+    def test_cache_stats_for_staff_only(self):
+        """Статистика кэша доступна только персоналу."""
+        user = get_user_model().objects.create(username='staff')
+        client = Client()
+        client.force_login(user)
+        self.assertEqual(client.get(CACHE_STATS).status_code, 302)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(client.get(CACHE_STATS).status_code, 200)
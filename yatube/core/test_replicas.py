@@ -0,0 +1,127 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.test import (
+    Client, RequestFactory, TestCase, override_settings,
+)
+from django.urls import reverse
+
+from posts.models import Post
+from .replicas import ReplicaRouter, pin_primary, read_replica
+
+COOKIE = 'primary_db'
+LAGGING = 'lagging'
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_COOKIE=COOKIE)
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+        @read_replica
+        def view(request):
+            return HttpResponse(self.router.db_for_read(Post) or 'default')
+
+        self.view = view
+
+    def test_reads_go_to_replica(self):
+        """GET-запрос читает из реплики, запись и прочее - из default."""
+        self.assertEqual(self.view(self.factory.get('/')).content, b'replica')
+        self.assertEqual(self.view(self.factory.post('/')).content, b'default')
+        self.assertIsNone(self.router.db_for_read(Post))
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+
+    def test_sessions_and_users_read_from_primary(self):
+        """Сессия и пользователь запроса читаются из основной базы."""
+        @read_replica
+        def view(request):
+            return HttpResponse(' '.join(
+                self.router.db_for_read(model) or 'default'
+                for model in (Session, User, Post)
+            ))
+
+        self.assertEqual(
+            view(self.factory.get('/')).content, b'default default replica'
+        )
+
+    def test_write_pins_user_to_primary(self):
+        """После записи пользователь читает из основной базы."""
+        request = self.factory.post('/')
+        request.user = User.objects.create_user(username='writer')
+        response = pin_primary(lambda request: redirect('/'))(request)
+        self.assertIn(COOKIE, response.cookies)
+        self.assertEqual(response.cookies[COOKIE]['max-age'], 10)
+        request = self.factory.get('/')
+        request.COOKIES[COOKIE] = '1'
+        self.assertEqual(self.view(request).content, b'default')
+
+    def test_form_errors_do_not_pin(self):
+        """Ответ без перенаправления не привязывает к основной базе."""
+        request = self.factory.post('/')
+        request.user = User.objects.create_user(username='writer')
+        response = pin_primary(lambda request: HttpResponse())(request)
+        self.assertNotIn(COOKIE, response.cookies)
+
+
+@override_settings(DATABASE_REPLICAS=[LAGGING], REPLICA_PIN_COOKIE=COOKIE)
+class ReplicaLagTests(TestCase):
+    """Реплика - файл SQLite со снимком основной базы, который отстаёт."""
+
+    def setUp(self):
+        cache.clear()
+        self.writer = User.objects.create_user(username='writer')
+        Post.objects.create(author=self.writer, text='Старый пост')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'replica.sqlite3')
+        # backup() ждёт конца транзакции теста, iterdump() читает
+        # данные внутри неё.
+        connection.ensure_connection()
+        replica = sqlite3.connect(path)
+        replica.executescript('\n'.join(connection.connection.iterdump()))
+        replica.close()
+        # Алиас появляется после setUpClass, поэтому TestCase не
+        # запрещает к нему запросы.
+        connections.databases[LAGGING] = {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': path,
+        }
+        self.addCleanup(self.drop_replica)
+
+    def drop_replica(self):
+        connections[LAGGING].close()
+        del connections[LAGGING]
+        del connections.databases[LAGGING]
+
+    def test_pinned_writer_sees_own_post(self):
+        """Кэш не собирается с реплики: автор видит свой пост сразу."""
+        pages = [
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.writer.username]),
+        ]
+        guest = Client()
+        writer = Client()
+        writer.force_login(self.writer)
+        for url in pages:
+            self.assertContains(guest.get(url), 'Старый пост')
+        writer.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+        self.assertIn(COOKIE, writer.cookies)
+        self.assertFalse(
+            Post.objects.using(LAGGING).filter(text='Новый пост').exists()
+        )
+        for url in pages:
+            with self.subTest(url=url):
+                # Аноним читает с реплики первым и не должен положить в
+                # кэш страницу без нового поста.
+                guest.get(url)
+                self.assertContains(writer.get(url), 'Новый пост')
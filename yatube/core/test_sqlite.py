@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+from .sqlite import apply_pragmas
+
+
+class SQLitePragmasTests(TestCase):
+    def test_new_connection_gets_pragmas(self):
+        """Соединение Django получает PRAGMA из настроек."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout']
+            )
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_apply_pragmas_to_file(self):
+        """Файловая база переходит в WAL."""
+        with tempfile.TemporaryDirectory() as directory:
+            db = sqlite3.connect(os.path.join(directory, 'db.sqlite3'))
+            apply_pragmas(db.cursor(), {'journal_mode': 'WAL'})
+            self.assertEqual(
+                db.execute('PRAGMA journal_mode').fetchone()[0], 'wal'
+            )
+            db.close()
+
+    def test_apply_pragmas_rejects_sql(self):
+        """В имя и значение PRAGMA нельзя подставить SQL."""
+        db = sqlite3.connect(':memory:')
+        for pragmas in ({'cache_size; DROP': 1}, {'journal_mode': 'WAL; --'}):
+            with self.subTest(pragmas=pragmas):
+                with self.assertRaises(ValueError):
+                    apply_pragmas(db.cursor(), pragmas)
+        db.close()
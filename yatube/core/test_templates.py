@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from .template_warmup import template_names, warm_templates
+
+
+class TemplateWarmupTests(TestCase):
+    def test_all_templates_compile(self):
+        """Прогрев компилирует все шаблоны проекта."""
+        names = list(template_names(settings.TEMPLATES_DIR))
+        self.assertIn('posts/includes/post_items.html', names)
+        self.assertEqual(warm_templates(), len(names))
+
+    def test_benchmark_templates_command(self):
+        """Команда benchmark_templates печатает замеры по всем страницам."""
+        out = StringIO()
+        call_command('benchmark_templates', iterations=1, stdout=out)
+        self.assertIn('posts/index.html', out.getvalue())
+        self.assertIn('{% post_item %}', out.getvalue())
@@ -1,30 +1,215 @@
+from functools import partial
+
+from django import forms
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.core.paginator import Paginator
+from django.db import models
+from django.forms.models import ModelChoiceIterator
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
 
+from . import moderation
+from .counters import bounded_count
 from .models import Post, Group, Comment, Follow
+from .search import search_comment_ids, search_ids
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списка в админке без полного COUNT(*): точное число до
+    FEED_COUNT_EXACT_LIMIT строк, дальше оценка (см. bounded_count).
+    """
+
+    @cached_property
+    def count(self):
+        return bounded_count(self.object_list)
+
+
+class SharedChoiceIterator(ModelChoiceIterator):
+    """
+    Варианты выбора, которые читаются из базы один раз на все копии.
+
+    Формсет копирует поле и виджет для каждой строки, копии итератора
+    делят общий cache.
+    """
+
+    def __init__(self, field):
+        super().__init__(field)
+        self.cache = {}
+
+    def __iter__(self):
+        if 'choices' not in self.cache:
+            self.cache['choices'] = list(super().__iter__())
+        return iter(self.cache['choices'])
+
+    def __len__(self):
+        return len(list(self))
+
+
+class SharedChoicesField(forms.ModelChoiceField):
+    """Ссылка в list_editable: один запрос вариантов на страницу."""
+
+    def __init__(self, *args, **kwargs):
+        self.shared_choices = None
+        super().__init__(*args, **kwargs)
+
+    def _get_choices(self):
+        if self.shared_choices is None:
+            self.shared_choices = SharedChoiceIterator(self)
+        return self.shared_choices
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+
+class IndexSearchMixin:
+    """Поиск в админке по поисковому индексу вместо icontains."""
+
+    index_search = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(pk__in=self.index_search(search_term)), False
 
 
-class PostAdmin(admin.ModelAdmin):
+class ScalableAdmin(admin.ModelAdmin):
+    """
+    Список без COUNT(*) по всей таблице; ссылки в list_editable
+    выбираются из общего для всех строк списка.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs.setdefault('formfield_callback', partial(
+            self.changelist_formfield, request=request
+        ))
+        return super().get_changelist_formset(request, **kwargs)
+
+    def changelist_formfield(self, db_field, request, **kwargs):
+        if isinstance(db_field, models.ForeignKey):
+            kwargs.update(form_class=SharedChoicesField, widget=forms.Select)
+        return self.formfield_for_dbfield(db_field, request, **kwargs)
+
+
+class ModerationMixin:
+    """
+    Вместо стандартного delete_selected, который грузит каждый объект и
+    шлёт сигналы, - массовые действия из posts.moderation.
+    """
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_authors_content(self, request, queryset):
+        posts, comments = moderation.delete_user_content(
+            queryset.order_by().values_list('author_id', flat=True).distinct()
+        )
+        self.message_user(
+            request, f'Удалено постов: {posts}, комментариев: {comments}.'
+        )
+    delete_authors_content.short_description = (
+        'Удалить все посты и комментарии авторов'
+    )
+
+
+MOVE_TO_GROUP_TEMPLATE = 'admin/posts/post/move_to_group.html'
+
+
+class MoveToGroupForm(forms.Form):
+    group = forms.ModelChoiceField(
+        Group.objects.all(), required=False, label='Группа',
+        empty_label='Без группы',
+    )
+
+
+class PostAdmin(ModerationMixin, IndexSearchMixin, ScalableAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    index_search = staticmethod(search_ids)
+    actions = (
+        'delete_posts', 'move_to_group', 'purge_comments',
+        'delete_authors_posts', 'delete_authors_content',
+    )
+
+    def delete_posts(self, request, queryset):
+        count = moderation.delete_posts(queryset)
+        self.message_user(request, f'Удалено постов: {count}.')
+    delete_posts.short_description = 'Удалить выбранные посты'
 
+    def delete_authors_posts(self, request, queryset):
+        count = moderation.delete_posts(Post.objects.filter(
+            author__in=queryset.order_by().values('author')
+        ))
+        self.message_user(request, f'Удалено постов: {count}.')
+    delete_authors_posts.short_description = 'Удалить все посты авторов'
 
-class GroupAdmin(admin.ModelAdmin):
+    def purge_comments(self, request, queryset):
+        count = moderation.purge_comments(queryset)
+        self.message_user(request, f'Удалено комментариев: {count}.')
+    purge_comments.short_description = 'Удалить все комментарии к постам'
+
+    def move_to_group(self, request, queryset):
+        """Сначала показывает форму выбора группы, потом переносит посты."""
+        form = MoveToGroupForm(
+            request.POST if 'apply' in request.POST else None
+        )
+        if form.is_valid():
+            count = moderation.move_to_group(
+                queryset, form.cleaned_data['group']
+            )
+            self.message_user(request, f'Перенесено постов: {count}.')
+            return None
+        return TemplateResponse(request, MOVE_TO_GROUP_TEMPLATE, {
+            **self.admin_site.each_context(request),
+            'title': 'Перенос постов в группу',
+            'opts': self.model._meta,
+            'form': form,
+            # С select_across=1 действие снова применится ко всему списку.
+            'select_across': request.POST.get('select_across', '0'),
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+    move_to_group.short_description = 'Перенести в группу'
+
+
+class GroupAdmin(ScalableAdmin):
     list_display = ('title', 'slug', 'description')
     search_fields = ('title',)
     empty_value_display = '-пусто-'
 
 
-class CommentsAdmin(admin.ModelAdmin):
+class CommentsAdmin(ModerationMixin, IndexSearchMixin, ScalableAdmin):
     list_display = ('text', 'post', 'author', 'created')
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
     search_fields = ('text',)
+    date_hierarchy = 'created'
     empty_value_display = '-пусто-'
+    index_search = staticmethod(search_comment_ids)
+    actions = ('delete_comments', 'delete_authors_content')
+
+    def delete_comments(self, request, queryset):
+        count = moderation.delete_comments(queryset)
+        self.message_user(request, f'Удалено комментариев: {count}.')
+    delete_comments.short_description = 'Удалить выбранные комментарии'
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(ScalableAdmin):
     list_display = ('user', 'author')
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
 
 
 admin.site.register(Post, PostAdmin)
@@ -0,0 +1,52 @@
+from functools import partial
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+
+from .models import Comment
+
+COMMENT_FIELDS = ('text', 'created', 'post', 'author', 'author__username')
+
+
+def comment_queryset():
+    """Комментарии с именем автора одним запросом."""
+    return Comment.objects.select_related('author').only(*COMMENT_FIELDS)
+
+
+def attach_latest_comments(posts, size=None):
+    """
+    Даёт каждому посту post.latest_comments - последние size комментариев.
+
+    Комментарии всей страницы выбираются одним запросом и только когда
+    шаблон впервые к ним обратится: если лента взята из кэша фрагментов,
+    запроса не будет.
+    """
+    size = settings.FEED_COMMENTS_PREVIEW if size is None else size
+    if not size:
+        return posts
+    post_ids = [post.pk for post in posts if post.comments_count]
+    loaded = {}
+
+    def latest(post_id):
+        if not loaded:
+            loaded.update({post_id: [] for post_id in post_ids})
+            for comment in latest_comments(post_ids, size):
+                loaded[comment.post_id].append(comment)
+        return loaded.get(post_id, [])
+
+    for post in posts:
+        # Шаблон вызывает функцию без аргументов сам.
+        post.latest_comments = partial(latest, post.pk)
+    return posts
+
+
+def latest_comments(post_ids, size):
+    """Последние size комментариев каждого из постов post_ids."""
+    if not post_ids:
+        return []
+    latest = Comment.objects.filter(
+        post_id=OuterRef('post_id')
+    ).order_by('-created', '-pk').values('pk')[:size]
+    return comment_queryset().filter(
+        post_id__in=post_ids, pk__in=Subquery(latest)
+    ).order_by('post_id', '-created', '-pk')
@@ -0,0 +1,98 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from core.caching import get_or_compute
+
+from .feeds import POST, feed_queryset
+from .generations import feed_version, get_generations
+from .models import Post
+
+
+def feed_etag(request, feed, owner=None, *depends_on):
+    """ETag страницы ленты, меняется вместе с поколением ленты."""
+    version = feed_version(request, feed, owner, *depends_on)
+    return hashlib.md5(version.encode()).hexdigest()
+
+
+def page_etag(request, feed, owner=None, *depends_on, extra=()):
+    """
+    ETag HTML-страницы ленты: кроме версии ленты зависит от пользователя
+    и от extra - прочих данных страницы вне ленты.
+    """
+    version = feed_version(request, feed, owner, *depends_on)
+    raw = ':'.join(map(str, [version, request.user.pk or '', *extra]))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def conditional_page(etag_func, last_modified_func=None):
+    """
+    condition() для HTML-страниц с заголовками кэширования.
+
+    Анонимам страница одна на всех: её можно держать в общем кэше
+    PAGE_CACHE_MAX_AGE секунд, а дальше перепроверять по ETag и
+    Last-Modified. Пользователю страница отдаётся private и каждый раз
+    перепроверяется только по ETag: Last-Modified не учитывает подписки
+    и прочее, что видно только ему.
+    """
+    def last_modified(request, *args, **kwargs):
+        if request.user.is_authenticated or last_modified_func is None:
+            return None
+        return last_modified_func(request, *args, **kwargs)
+
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=etag_func, last_modified_func=last_modified
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(
+                    response, public=True,
+                    max_age=settings.PAGE_CACHE_MAX_AGE,
+                )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def feed_last_modified(feed, owner=None):
+    """
+    Время последнего поста ленты.
+
+    Считается один раз на поколение ленты, дальше берётся из кэша без
+    запроса к постам.
+    """
+    return _per_generation(
+        feed, owner,
+        lambda: feed_queryset(feed, owner).aggregate(
+            Max('pub_date')
+        )['pub_date__max'],
+    )
+
+
+def post_last_modified(post_id):
+    """Время поста или последнего комментария к нему."""
+    def compute():
+        times = Post.objects.filter(pk=post_id).annotate(
+            last_comment=Max('comments__created')
+        ).values_list('pub_date', 'last_comment').first()
+        return max(filter(None, times)) if times else None
+    return _per_generation(POST, post_id, compute)
+
+
+def _per_generation(feed, owner, compute):
+    generation, = get_generations((feed, owner))
+    return get_or_compute(
+        f'feed_modified:{feed}:{owner or ""}:{generation}', compute,
+        settings.FEED_CACHE_TIMEOUT, name='feed_modified',
+    )
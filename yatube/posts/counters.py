@@ -0,0 +1,98 @@
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count
+
+from core.replicas import primary
+
+from . import follow_graph
+from .feeds import AUTHOR, FOLLOW, GROUP, INDEX, feed_queryset
+from .models import Post
+
+EXPLAIN_ROWS = re.compile(r'rows=(\d+)')
+
+
+def count_key(feed, owner=None):
+    return f'feed_count:{feed}:{owner or ""}'
+
+
+def feed_count(feed, owner=None):
+    """
+    Число постов в ленте из кэша.
+
+    Общая лента, группы и авторы хранят свой счётчик, счётчик ленты
+    подписок складывается из счётчиков авторов, на которых подписан owner.
+    """
+    if feed == FOLLOW:
+        return follow_count(owner)
+    key = count_key(feed, owner)
+    count = cache.get(key)
+    if count is None:
+        with primary():
+            count = bounded_count(feed_queryset(feed, owner))
+        cache.set(key, count, settings.FEED_COUNT_TIMEOUT)
+    return count
+
+
+def follow_count(user_id):
+    keys = {
+        count_key(AUTHOR, author_id): author_id
+        for author_id in follow_graph.followees(user_id)
+    }
+    counts = cache.get_many(keys)
+    missing = [author for key, author in keys.items() if key not in counts]
+    if missing:
+        with primary():
+            fresh = dict(
+                Post.objects.filter(author_id__in=missing).order_by()
+                .values_list('author_id').annotate(Count('pk'))
+            )
+        fresh = {
+            count_key(AUTHOR, author): fresh.get(author, 0)
+            for author in missing
+        }
+        cache.set_many(fresh, settings.FEED_COUNT_TIMEOUT)
+        counts.update(fresh)
+    return sum(counts.values())
+
+
+def bounded_count(queryset):
+    """
+    Точный COUNT, пока постов не больше FEED_COUNT_EXACT_LIMIT,
+    дальше оценка по плану запроса.
+    """
+    limit = settings.FEED_COUNT_EXACT_LIMIT
+    count = queryset.order_by().values('pk')[:limit + 1].count()
+    if count <= limit:
+        return count
+    return max(estimate_count(queryset), count)
+
+
+def estimate_count(queryset):
+    """Оценка числа строк планировщиком; 0, если СУБД её не отдаёт."""
+    if connections[queryset.db].vendor != 'postgresql':
+        return 0
+    rows = EXPLAIN_ROWS.search(queryset.order_by().explain())
+    return int(rows.group(1)) if rows else 0
+
+
+def change_count(delta, group_id=None, author_id=None):
+    """Сдвигает закэшированные счётчики лент, в которые входит пост."""
+    deltas = {(INDEX, None): delta, (AUTHOR, author_id): delta}
+    if group_id:
+        deltas[GROUP, group_id] = delta
+    change_counts(deltas)
+
+
+def change_counts(deltas):
+    """Сдвигает счётчики сразу многих лент: {(лента, владелец): delta}."""
+    for (feed, owner), delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(count_key(feed, owner), delta)
+        except ValueError:
+            # Счётчика ещё нет в кэше, он посчитается при первом запросе.
+            pass
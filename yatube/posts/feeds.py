@@ -0,0 +1,76 @@
+from django.db.models import F, Q
+
+from .models import Post, TimelineEntry
+from .timeline import celebrity_followees
+
+INDEX = 'index'
+GROUP = 'group'
+AUTHOR = 'author'
+FOLLOW = 'follow'
+POST = 'post'
+# Ключ страниц ленты подписок: дата и пост записи TimelineEntry, чтобы
+# страница читалась по индексу (user, -pub_date, -post) без сортировки.
+TIMELINE_KEY = ('timeline_pub_date', 'timeline_post_id')
+
+FEED_FIELDS = (
+    'text', 'pub_date', 'image', 'image_thumbnail', 'image_sources',
+    'image_status', 'comments_count', 'author', 'group',
+    'author__username', 'author__first_name', 'author__last_name',
+    'group__slug', 'group__title',
+)
+
+
+def post_feeds(post_id, group_id=None, author_id=None):
+    """Ленты, в которых показывается пост, парами (лента, владелец)."""
+    feeds = [(INDEX, None), (POST, post_id), (AUTHOR, author_id)]
+    if group_id:
+        feeds.append((GROUP, group_id))
+    return feeds
+
+
+def feed_key(feed):
+    """Ключ и tiebreak для KeysetPaginator страниц ленты."""
+    if feed == FOLLOW:
+        return TIMELINE_KEY
+    return 'pub_date', 'pk'
+
+
+def feed_queryset(feed=INDEX, owner=None):
+    """
+    Посты ленты feed владельца owner вместе с автором и группой.
+
+    Все ленты собираются здесь, чтобы шаблону post_items.html хватало
+    одного запроса на страницу.
+    """
+    posts = Post.objects.select_related('author', 'group').only(*FEED_FIELDS)
+    if feed == GROUP:
+        return posts.filter(group_id=owner)
+    if feed == AUTHOR:
+        return posts.filter(author_id=owner)
+    if feed == FOLLOW:
+        return follow_queryset(posts, owner)
+    return posts
+
+
+def follow_queryset(posts, user_id):
+    """
+    Лента подписок читается из материализованной TimelineEntry.
+
+    Посты авторов с огромным числом подписчиков в ленты не раздаются
+    и подмешиваются здесь, при чтении; тогда ключ TIMELINE_KEY берётся
+    из самих постов.
+    """
+    celebrities = celebrity_followees(user_id)
+    if not celebrities:
+        posts = posts.filter(timeline_entries__user_id=user_id).annotate(
+            timeline_pub_date=F('timeline_entries__pub_date'),
+            timeline_post_id=F('timeline_entries__post_id'),
+        )
+    else:
+        posts = posts.filter(
+            Q(pk__in=TimelineEntry.objects.filter(
+                user_id=user_id
+            ).values('post_id'))
+            | Q(author_id__in=celebrities)
+        ).annotate(timeline_pub_date=F('pub_date'), timeline_post_id=F('pk'))
+    return posts.order_by(*(f'-{field}' for field in TIMELINE_KEY))
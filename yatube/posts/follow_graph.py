@@ -0,0 +1,132 @@
+"""
+Граф подписок в кэше.
+
+Подписки пользователя хранятся отсортированным массивом 32-битных id
+авторов (array('I')), упакованным в байты: 4 байта на подписку. Ключи
+вытесняет сам кэш по FOLLOW_GRAPH_TIMEOUT или при нехватке места, промах
+читается из Follow одним запросом. Сигналы Follow обновляют кэш после
+коммита (write-through), поэтому проверки подписки и списки подписок
+обходятся без SQL.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from core.replicas import primary
+
+from .models import Follow
+
+FOLLOWEES_KEY = 'follow_graph:followees:{}'
+FOLLOWERS_COUNT_KEY = 'follow_graph:followers_count:{}'
+TYPECODE = 'I'
+
+
+def followees(user_id):
+    """Отсортированный array id авторов, на которых подписан user_id."""
+    return followees_many([user_id])[user_id]
+
+
+def followees_many(user_ids):
+    """Подписки многих пользователей: одно обращение к кэшу на всех."""
+    keys = {FOLLOWEES_KEY.format(user_id): user_id for user_id in user_ids}
+    graph = {
+        keys[key]: _unpack(raw) for key, raw in cache.get_many(keys).items()
+    }
+    missing = [user_id for user_id in keys.values() if user_id not in graph]
+    if missing:
+        graph.update(_load(missing))
+    return graph
+
+
+def is_following(user_id, author_id):
+    """Подписан ли user_id на author_id: двоичный поиск в его массиве."""
+    if not user_id or not author_id:
+        return False
+    return _contains(followees(user_id), author_id)
+
+
+def mutuals(user_id):
+    """Авторы из подписок user_id, которые подписаны на него в ответ."""
+    authors = followees(user_id)
+    graph = followees_many(authors)
+    return [
+        author_id for author_id in authors
+        if _contains(graph[author_id], user_id)
+    ]
+
+
+def followers_count(author_id):
+    count = cache.get(FOLLOWERS_COUNT_KEY.format(author_id))
+    if count is None:
+        count = _load_followers_counts([author_id])[author_id]
+    return count
+
+
+def refresh(user_ids, author_ids=()):
+    """
+    Сбрасывает подписки user_ids и число подписчиков author_ids, а после
+    коммита записывает их в кэш заново.
+
+    Сброс сразу нужен, пока транзакция не закрыта: иначе этот же запрос
+    прочитал бы старые подписки. Если до коммита кто-то успеет положить
+    в кэш старое состояние, его перезапишет write-through.
+    """
+    user_ids, author_ids = list(user_ids), list(author_ids)
+    cache.delete_many(
+        [FOLLOWEES_KEY.format(user_id) for user_id in user_ids]
+        + [FOLLOWERS_COUNT_KEY.format(author_id) for author_id in author_ids]
+    )
+
+    def write_through():
+        _load(user_ids)
+        _load_followers_counts(author_ids)
+    transaction.on_commit(write_through)
+
+
+@primary()
+def _load(user_ids):
+    graph = {user_id: array(TYPECODE) for user_id in user_ids}
+    for user_id, author_id in Follow.objects.filter(
+        user_id__in=user_ids
+    ).order_by('user_id', 'author_id').values_list('user_id', 'author_id'):
+        graph[user_id].append(author_id)
+    cache.set_many(
+        {
+            FOLLOWEES_KEY.format(user_id): authors.tobytes()
+            for user_id, authors in graph.items()
+        },
+        settings.FOLLOW_GRAPH_TIMEOUT,
+    )
+    return graph
+
+
+@primary()
+def _load_followers_counts(author_ids):
+    counts = {author_id: 0 for author_id in author_ids}
+    counts.update(
+        Follow.objects.filter(author_id__in=author_ids).order_by()
+        .values_list('author_id').annotate(Count('pk'))
+    )
+    cache.set_many(
+        {
+            FOLLOWERS_COUNT_KEY.format(author_id): count
+            for author_id, count in counts.items()
+        },
+        settings.FOLLOW_GRAPH_TIMEOUT,
+    )
+    return counts
+
+
+def _unpack(raw):
+    authors = array(TYPECODE)
+    authors.frombytes(raw)
+    return authors
+
+
+def _contains(authors, author_id):
+    index = bisect_left(authors, author_id)
+    return index < len(authors) and authors[index] == author_id
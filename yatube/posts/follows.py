@@ -0,0 +1,64 @@
+"""
+Подписка и отписка сразу на многих авторов.
+
+Вместо сигналов Follow на каждую строку: авторы ищутся одним запросом,
+подписки вставляются bulk_create, а статистика, ленты подписок, граф
+подписок и поколение ленты обновляются один раз на весь список.
+"""
+from django.db import transaction
+
+from . import follow_graph, generations, timeline
+from .feeds import FOLLOW
+from .models import Follow, TimelineEntry, User
+from .moderation import delete_without_signals
+from .stats import change_stats, change_stats_many
+
+
+def follow_many(user_id, usernames):
+    """Подписывает user_id на авторов usernames; число новых подписок."""
+    authors = set(User.objects.filter(
+        username__in=usernames
+    ).exclude(pk=user_id).values_list('pk', flat=True))
+    if not authors:
+        return 0
+    with transaction.atomic():
+        # Уже существующие подписки берутся из базы, а не из графа в
+        # кэше: устаревший кэш иначе раздул бы счётчики.
+        new = sorted(authors - set(Follow.objects.filter(
+            user_id=user_id, author_id__in=authors
+        ).values_list('author_id', flat=True)))
+        if not new:
+            return 0
+        Follow.objects.bulk_create(
+            [Follow(user_id=user_id, author_id=author) for author in new],
+            ignore_conflicts=True,
+        )
+        _follows_changed(user_id, new, 1)
+        timeline.backfill_many(user_id, new)
+    return len(new)
+
+
+def unfollow_many(user_id, usernames):
+    """Отписывает user_id от авторов usernames; число удалённых подписок."""
+    authors = list(Follow.objects.filter(
+        user_id=user_id, author__username__in=usernames
+    ).values_list('author_id', flat=True))
+    if not authors:
+        return 0
+    with transaction.atomic():
+        delete_without_signals(
+            Follow.objects.filter(user_id=user_id, author_id__in=authors)
+        )
+        TimelineEntry.objects.filter(
+            user_id=user_id, author_id__in=authors
+        ).delete()
+        _follows_changed(user_id, authors, -1)
+        timeline.restore_fan_out(authors)
+    return len(authors)
+
+
+def _follows_changed(user_id, author_ids, delta):
+    change_stats(user_id, 'following_count', delta * len(author_ids))
+    change_stats_many(author_ids, 'followers_count', delta)
+    generations.bump((FOLLOW, user_id))
+    follow_graph.refresh([user_id], author_ids)
@@ -1,9 +1,28 @@
+import re
+
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 
 from .models import Post, Comment
 
 
 class PostForm(forms.ModelForm):
+    def __init__(self, *args, oversized=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.oversized = oversized
+
+    def clean_image(self):
+        if 'image' in self.oversized:
+            raise forms.ValidationError(
+                'Картинка больше %(limit)s.',
+                code='file_too_large',
+                params={
+                    'limit': filesizeformat(settings.FILE_UPLOAD_MAX_SIZE)
+                },
+            )
+        return self.cleaned_data['image']
+
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
@@ -13,3 +32,22 @@ class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class BulkFollowForm(forms.Form):
+    usernames = forms.CharField(
+        widget=forms.Textarea,
+        label='Авторы',
+        help_text='Имена пользователей через запятую или с новой строки',
+    )
+
+    def clean_usernames(self):
+        names = re.split(r'[\s,]+', self.cleaned_data['usernames'])
+        usernames = list(dict.fromkeys(name for name in names if name))
+        if len(usernames) > settings.FOLLOW_BULK_LIMIT:
+            raise forms.ValidationError(
+                'За раз можно подписаться не больше чем на %(limit)s авторов.',
+                code='too_many_authors',
+                params={'limit': settings.FOLLOW_BULK_LIMIT},
+            )
+        return usernames
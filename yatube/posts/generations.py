@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def generation_key(feed, owner=None):
+    return f'feed_generation:{feed}:{owner or ""}'
+
+
+def _initial():
+    # Поколение начинается с текущего времени в мс, чтобы после вытеснения
+    # ключа из кэша не вернуться к значению, под которым лежат фрагменты.
+    return int(time.time() * 1000)
+
+
+def get_generations(*feeds):
+    """Текущие поколения для пар (лента, владелец)."""
+    keys = [generation_key(*feed) for feed in feeds]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, _initial(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump(*feeds):
+    """Сдвигает поколения лент, все их фрагменты сразу устаревают."""
+    for feed in feeds:
+        key = generation_key(*feed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial(), None)
+
+
+def feed_version(request, feed, owner=None, *depends_on):
+    """
+    Версия страницы ленты: лента, поколения её и лент из depends_on,
+    страница или курсор из запроса.
+    """
+    generations = get_generations((feed, owner), *depends_on)
+    return ':'.join(map(str, [
+        feed, owner or '', *generations,
+        request.GET.get('cursor', ''), request.GET.get('page', ''),
+    ]))
+
+
+def fragment_cache(request, feed, owner=None, *depends_on):
+    """Таймаут и ключ для {% fragment_cache %} вокруг ленты."""
+    return {
+        'timeout': settings.FEED_CACHE_TIMEOUT,
+        'key': feed_version(request, feed, owner, *depends_on),
+    }
@@ -0,0 +1,120 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sqlite import apply_pragmas
+
+SCHEMA = (
+    'CREATE TABLE post ('
+    'id INTEGER PRIMARY KEY, text TEXT NOT NULL, '
+    'pub_date REAL NOT NULL, author_id INTEGER NOT NULL)',
+    'CREATE INDEX post_pub_date ON post (pub_date)',
+    'CREATE INDEX post_author ON post (author_id, pub_date)',
+)
+INSERT = 'INSERT INTO post (text, pub_date, author_id) VALUES (?, ?, ?)'
+AUTHORS = 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет чтения и записи в SQLite из нескольких потоков с '
+        'настройками по умолчанию и с SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=4, help='Потоков-читателей.'
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2, help='Потоков-писателей.'
+        )
+        parser.add_argument(
+            '--seconds', type=float, default=5, help='Длительность замера.'
+        )
+        parser.add_argument(
+            '--rows', type=int, default=20000,
+            help='Сколько постов в базе перед замером.',
+        )
+
+    def handle(self, *args, **options):
+        for title, pragmas in (
+            ('По умолчанию', {}),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS),
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self.seed(path, options['rows'])
+                result = self.measure(path, pragmas, options)
+            self.stdout.write(
+                f'{title}: чтений {result["reads"] / options["seconds"]:.0f}'
+                f'/с, записей {result["writes"] / options["seconds"]:.0f}/с, '
+                f'ошибок блокировки {result["locked"]}'
+            )
+
+    def seed(self, path, rows):
+        connection = sqlite3.connect(path)
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.executemany(INSERT, (
+                (f'Пост {i}', i, i % AUTHORS) for i in range(rows)
+            ))
+        connection.close()
+
+    def measure(self, path, pragmas, options):
+        """Гоняет читателей и писателей options['seconds'] секунд."""
+        result = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+
+        def worker(operation):
+            # Как у Django: автокоммит и таймаут драйвера 5 секунд.
+            connection = sqlite3.connect(
+                path, isolation_level=None, check_same_thread=False
+            )
+            apply_pragmas(connection.cursor(), pragmas)
+            done = locked = 0
+            while time.monotonic() < deadline:
+                try:
+                    operation(connection)
+                    done += 1
+                except sqlite3.OperationalError:
+                    locked += 1
+            connection.close()
+            key = 'writes' if operation is self.write else 'reads'
+            with lock:
+                result[key] += done
+                result['locked'] += locked
+
+        threads = [
+            threading.Thread(target=worker, args=(self.read,))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=(self.write,))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return result
+
+    @staticmethod
+    def read(connection):
+        """Страница ленты автора, как в profile."""
+        connection.execute(
+            'SELECT id, text, pub_date FROM post WHERE author_id = ? '
+            'ORDER BY pub_date DESC LIMIT 10', (random.randrange(AUTHORS),)
+        ).fetchall()
+
+    @staticmethod
+    def write(connection):
+        connection.execute(
+            INSERT, ('Новый пост', time.time(), random.randrange(AUTHORS))
+        )
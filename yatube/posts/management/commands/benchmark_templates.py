@@ -0,0 +1,101 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import Context, Engine, RequestContext, engines
+from django.test import RequestFactory
+
+from posts.feeds import feed_queryset
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+PAGES = ('posts/index.html', 'posts/group_list.html', 'posts/profile.html')
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время рендера страниц ленты с разными загрузчиками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Сколько раз рендерить каждую страницу.',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        posts = list(feed_queryset()[:settings.POSTS_ON_PAGE])
+        page_obj = Paginator(posts, settings.POSTS_ON_PAGE).page(1)
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        context = {
+            'page_obj': page_obj,
+            'group': {'title': 'Группа', 'description': ''},
+            'author': AnonymousUser(),
+            'stats': {},
+            # Нулевой таймаут: фрагмент рендерится на каждой итерации.
+            'feed_cache': {'timeout': 0, 'key': ''},
+        }
+        self.stdout.write(f'Постов на странице: {len(posts)}')
+        for title, loaders in (
+            ('Без кэша шаблонов', LOADERS),
+            ('Кэширующий загрузчик', [
+                ('django.template.loaders.cached.Loader', LOADERS)
+            ]),
+        ):
+            engine = self.engine(loaders)
+            for name in PAGES:
+                elapsed = self.measure(iterations, lambda: engine.get_template(
+                    name
+                ).render(RequestContext(request, context)))
+                self.report(f'{title}, {name}', elapsed)
+        self.compare_post_items(iterations, posts)
+
+    def compare_post_items(self, iterations, posts):
+        """Карточки постов через {% include %} против {% post_item %}."""
+        engine = self.engine([('django.template.loaders.cached.Loader', [
+            ('django.template.loaders.locmem.Loader', {
+                'include.html': (
+                    '{% for post in posts %}'
+                    '{% include "posts/includes/post_items.html" '
+                    'with last=forloop.last %}{% endfor %}'
+                ),
+                'tag.html': (
+                    '{% load post_item %}{% for post in posts %}'
+                    '{% post_item post last=forloop.last %}{% endfor %}'
+                ),
+            }),
+            *LOADERS,
+        ])])
+        for title, name in (
+            ('{% include %} на каждый пост', 'include.html'),
+            ('{% post_item %} на каждый пост', 'tag.html'),
+        ):
+            template = engine.get_template(name)
+            elapsed = self.measure(
+                iterations, lambda: template.render(Context({'posts': posts}))
+            )
+            self.report(title, elapsed)
+
+    def engine(self, loaders):
+        """Движок с настройками проекта, но со своими загрузчиками."""
+        configured = engines['django'].engine
+        return Engine(
+            dirs=configured.dirs,
+            loaders=loaders,
+            context_processors=configured.context_processors,
+            libraries=configured.libraries,
+        )
+
+    def measure(self, iterations, render):
+        render()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            render()
+        return (time.perf_counter() - started) / iterations
+
+    def report(self, title, elapsed):
+        self.stdout.write(f'{title}: {elapsed * 1000:.2f} мс')
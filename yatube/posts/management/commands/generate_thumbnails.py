@@ -0,0 +1,39 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import Post
+from posts.thumbnails import process_image, run
+
+
+class Command(BaseCommand):
+    help = 'Нарезает картинки постов во всех размерах и форматах.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать и уже готовые картинки.',
+        )
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Число процессов; 0 - резать в текущем процессе.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(image_thumbnail='')
+        post_ids = list(posts.values_list('pk', flat=True))
+        if options['processes']:
+            # Дочерние процессы не должны делить соединение с родителем.
+            connections.close_all()
+            with ProcessPoolExecutor(options['processes']) as executor:
+                list(executor.map(run, post_ids, chunksize=16))
+        else:
+            for post_id in post_ids:
+                process_image(post_id)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано постов: {len(post_ids)}')
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import User
+from posts.timeline import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок пользователей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Пользователи для пересборки, по умолчанию все.',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        user_ids = list(users.values_list('pk', flat=True))
+        rebuild(user_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересобрано лент: {len(user_ids)}')
+        )
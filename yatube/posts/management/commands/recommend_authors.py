@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import recompute
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации «на кого подписаться» по графу '
+        'подписок и активности в группах; запускается по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Пользователей в одной транзакции записи.',
+        )
+
+    def handle(self, *args, **options):
+        stored = recompute(options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Сохранено рекомендаций: {stored}')
+        )
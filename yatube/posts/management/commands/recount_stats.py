@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post, User
+from posts.stats import recount_comments, recount_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики постов, подписок и комментариев '
+        'пользователей и число комментариев у их постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Пользователи для пересчёта, по умолчанию все.',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = posts = None
+        if options['usernames']:
+            user_ids = User.objects.filter(
+                username__in=options['usernames']
+            ).values_list('pk', flat=True)
+            posts = Post.objects.filter(author_id__in=user_ids)
+        count = recount_stats(user_ids)
+        posts_count = recount_comments(posts)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано пользователей: {count}, постов: {posts_count}'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_thumbnail',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Адрес миниатюры'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_image_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_sources',
+            field=models.TextField(blank=True, editable=False, help_text='JSON-список пар [MIME-тип, srcset]', verbose_name='Размеры картинки'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_image_sources'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('processing', 'Обрабатывается'), ('ready', 'Готова'), ('failed', 'Не удалось обработать')], editable=False, max_length=10, verbose_name='Состояние картинки'),
+        ),
+    ]
@@ -1,3 +1,6 @@
+import json
+from contextvars import ContextVar
+
 from django.db import models
 from django.db.models import UniqueConstraint
 from django.contrib.auth import get_user_model
@@ -5,6 +8,10 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# Посты, которые сейчас удаляет Post.delete(): сигналы списывают их
+# комментарии разом в post_deleted, а не по одному в comment_deleted.
+deleting_posts = ContextVar('deleting_posts', default=frozenset())
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -31,6 +38,15 @@ class Group(models.Model):
 
 
 class Post(models.Model):
+    IMAGE_PROCESSING = 'processing'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+    IMAGE_STATUSES = (
+        (IMAGE_PROCESSING, 'Обрабатывается'),
+        (IMAGE_READY, 'Готова'),
+        (IMAGE_FAILED, 'Не удалось обработать'),
+    )
+
     text = models.TextField(
         verbose_name='Текст поста',
         help_text='Текст нового поста'
@@ -60,14 +76,71 @@ class Post(models.Model):
         verbose_name='Картинка',
         help_text='Загрузите картинку',
     )
+    image_thumbnail = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name='Адрес миниатюры',
+    )
+    image_sources = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Размеры картинки',
+        help_text='JSON-список пар [MIME-тип, srcset]',
+    )
+    image_status = models.CharField(
+        max_length=10,
+        blank=True,
+        editable=False,
+        choices=IMAGE_STATUSES,
+        verbose_name='Состояние картинки',
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Комментариев',
+    )
 
     def __str__(self) -> str:
         return self.text[:15]
 
+    def delete(self, *args, **kwargs):
+        # Отметка снимается, даже если удаление упало: иначе комментарии
+        # поста потом удалялись бы без учёта в счётчиках.
+        token = deleting_posts.set(deleting_posts.get() | {self.pk})
+        try:
+            return super().delete(*args, **kwargs)
+        finally:
+            deleting_posts.reset(token)
+
+    @property
+    def image_srcsets(self):
+        return self.parse_image_sources(self.image_sources)
+
+    @staticmethod
+    def parse_image_sources(image_sources):
+        try:
+            return json.loads(image_sources or '[]')
+        except ValueError:
+            return []
+
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'), name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=('group', 'pub_date', 'id'),
+                name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='post_author_pub_date_idx'
+            ),
+        )
 
 
 class Comment(models.Model):
@@ -99,6 +172,15 @@ class Comment(models.Model):
         ordering = ('-created',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created', 'id'),
+                name='comment_post_created_idx'
+            ),
+            models.Index(
+                fields=('created', 'id'), name='comment_created_idx'
+            ),
+        )
 
 
 class Follow(models.Model):
@@ -112,6 +194,144 @@ class Follow(models.Model):
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
-        UniqueConstraint(
-            fields=('author', 'user'), name='Контроль повторной подписки'
+        constraints = (
+            UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        )
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Всего постов',
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписок',
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписчиков',
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Всего комментариев',
+    )
+
+    def __str__(self) -> str:
+        return str(self.user)
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор',
+    )
+    # Копия Post.pub_date: страница ленты читается по индексу записей
+    # без соединения со всеми постами и сортировки.
+    pub_date = models.DateTimeField(verbose_name='Дата публикации поста')
+
+    class Meta:
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи ленты подписок'
+        constraints = (
+            UniqueConstraint(
+                fields=('user', 'post'), name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', 'author'), name='timeline_user_author_idx'
+            ),
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_user_pub_date_idx'
+            ),
+        )
+
+
+class SearchEntry(models.Model):
+    term = models.CharField(
+        max_length=64,
+        verbose_name='Основа слова',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_entries',
+        verbose_name='Пост',
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='search_entries',
+        verbose_name='Комментарий',
+    )
+    weight = models.PositiveIntegerField(
+        verbose_name='Вес',
+        help_text='Вхождения слова с учётом веса текста поста',
+    )
+
+    class Meta:
+        verbose_name = 'Слово поиска'
+        verbose_name_plural = 'Поисковый индекс'
+        indexes = (
+            models.Index(fields=('term', 'post'), name='search_term_post_idx'),
+        )
+
+
+class Recommendation(models.Model):
+    """Автор, которого советует офлайн-расчёт (posts.recommendations)."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Пользователь',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендуемый автор',
+    )
+    score = models.FloatField(verbose_name='Вес')
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        constraints = (
+            UniqueConstraint(
+                fields=('user', 'author'), name='unique_recommendation'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-score'), name='recommendation_user_idx'
+            ),
         )
@@ -0,0 +1,141 @@
+"""
+Массовая модерация без сигналов на каждую строку.
+
+Записи меняются и удаляются пачками по MODERATION_BATCH_SIZE одним
+запросом на модель, а счётчики лент, статистика и поколения лент
+сдвигаются один раз на пачку.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from . import counters, generations
+from .feeds import AUTHOR, GROUP, INDEX, POST
+from .models import Comment, Post, SearchEntry, TimelineEntry
+from .stats import change_stats, recount_comments
+
+
+def delete_posts(posts):
+    """Удаляет посты вместе с комментариями; возвращает число постов."""
+    return sum(_delete_post_batch(ids) for ids in _batches(posts))
+
+
+def delete_comments(comments):
+    """Удаляет комментарии; возвращает их число."""
+    return sum(_delete_comment_batch(ids) for ids in _batches(comments))
+
+
+def purge_comments(posts):
+    """Удаляет все комментарии к постам; возвращает число комментариев."""
+    return delete_comments(
+        Comment.objects.filter(post__in=posts.order_by().values('pk'))
+    )
+
+
+def move_to_group(posts, group):
+    """Переносит посты в группу (None - убирает из групп)."""
+    group_id = group.pk if group else None
+    return sum(_move_batch(ids, group_id) for ids in _batches(posts))
+
+
+def delete_user_content(user_ids):
+    """Все посты и комментарии пользователей: (постов, комментариев)."""
+    user_ids = list(user_ids)
+    return (
+        delete_posts(Post.objects.filter(author_id__in=user_ids)),
+        delete_comments(Comment.objects.filter(author_id__in=user_ids)),
+    )
+
+
+def delete_without_signals(queryset):
+    """
+    DELETE одним запросом. QuerySet.delete() выбрал бы каждую строку ради
+    сигналов post_delete; зависимые записи вызывающий удаляет сам.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def _batches(queryset):
+    ids = list(queryset.order_by().values_list('pk', flat=True))
+    size = settings.MODERATION_BATCH_SIZE
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+@transaction.atomic
+def _delete_post_batch(ids):
+    posts = list(
+        Post.objects.filter(pk__in=ids).values_list('author_id', 'group_id')
+    )
+    comment_authors = dict(
+        Comment.objects.filter(post_id__in=ids).order_by()
+        .values_list('author_id').annotate(Count('pk'))
+    )
+    SearchEntry.objects.filter(post_id__in=ids).delete()
+    TimelineEntry.objects.filter(post_id__in=ids).delete()
+    delete_without_signals(Comment.objects.filter(post_id__in=ids))
+    delete_without_signals(Post.objects.filter(pk__in=ids))
+    deltas = Counter()
+    for author_id, group_id in posts:
+        deltas[INDEX, None] -= 1
+        deltas[AUTHOR, author_id] -= 1
+        if group_id:
+            deltas[GROUP, group_id] -= 1
+    counters.change_counts(deltas)
+    for (feed, owner), delta in deltas.items():
+        if feed == AUTHOR:
+            change_stats(owner, 'posts_count', delta)
+    for author_id, count in comment_authors.items():
+        change_stats(author_id, 'comments_count', -count)
+    # Страницы удалённых постов отдают 404, их поколения не нужны.
+    generations.bump(*deltas)
+    return len(posts)
+
+
+@transaction.atomic
+def _delete_comment_batch(ids):
+    comments = Comment.objects.filter(pk__in=ids)
+    post_ids = set(comments.values_list('post_id', flat=True))
+    authors = dict(
+        comments.order_by().values_list('author_id').annotate(Count('pk'))
+    )
+    SearchEntry.objects.filter(comment_id__in=ids).delete()
+    deleted = delete_without_signals(comments)
+    recount_comments(Post.objects.filter(pk__in=post_ids))
+    for author_id, count in authors.items():
+        change_stats(author_id, 'comments_count', -count)
+    generations.bump(*_post_feeds(post_ids))
+    return deleted
+
+
+@transaction.atomic
+def _move_batch(ids, group_id):
+    posts = Post.objects.filter(pk__in=ids)
+    old_feeds = _post_feeds(ids)
+    moved = Counter(
+        posts.exclude(group_id=group_id).values_list('group_id', flat=True)
+    )
+    posts.update(group_id=group_id)
+    deltas = Counter()
+    for old_group_id, count in moved.items():
+        if old_group_id:
+            deltas[GROUP, old_group_id] -= count
+        if group_id:
+            deltas[GROUP, group_id] += count
+    counters.change_counts(deltas)
+    generations.bump(*old_feeds, *deltas)
+    return len(ids)
+
+
+def _post_feeds(post_ids):
+    """Ленты, в которых показываются посты post_ids, без повторов."""
+    feeds = {(INDEX, None)}
+    for pk, author_id, group_id in Post.objects.filter(
+        pk__in=post_ids
+    ).values_list('pk', 'author_id', 'group_id'):
+        feeds.update([(POST, pk), (AUTHOR, author_id)])
+        if group_id:
+            feeds.add((GROUP, group_id))
+    return feeds
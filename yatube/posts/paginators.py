@@ -0,0 +1,188 @@
+import base64
+import binascii
+import datetime
+import json
+import math
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import DateTimeField, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+LAST = 'l'
+# Целые в токене не должны выходить за INTEGER базы.
+MAX_INTEGER = 2 ** 63 - 1
+
+
+def encode_cursor(direction, value=None, pk=None, number=None):
+    """Упаковывает позицию в ленте в непрозрачный токен для ?cursor=."""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    raw = json.dumps([direction, value, pk, number], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, datetime_key=True):
+    """
+    Распаковывает токен; при любой порче бросает ValueError. Значение
+    ключа-даты приходит строкой ISO 8601, остальных ключей - числом.
+    Числа вне 64-битного INTEGER тоже считаются порчей.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, value, pk, number = json.loads(raw.decode())
+        number = int(number or 1)
+    except (
+        binascii.Error, UnicodeDecodeError, TypeError, OverflowError,
+    ) as error:
+        raise ValueError(error)
+    if direction not in (NEXT, PREVIOUS, LAST) or abs(number) > MAX_INTEGER:
+        raise ValueError(cursor)
+    if direction == LAST:
+        return direction, value, pk, number
+    if (
+        isinstance(pk, bool) or not isinstance(pk, int)
+        or abs(pk) > MAX_INTEGER
+    ):
+        raise ValueError(cursor)
+    if datetime_key:
+        value = isinstance(value, str) and parse_datetime(value)
+        if not value:
+            raise ValueError(cursor)
+    elif (
+        isinstance(value, bool) or not isinstance(value, (int, float))
+        or not math.isfinite(value) or abs(value) > MAX_INTEGER
+    ):
+        raise ValueError(cursor)
+    return direction, value, pk, number
+
+
+class KeysetPaginator(Paginator):
+    """
+    Пагинатор, который листает ленту по ключу (key, tiebreak) без OFFSET;
+    tiebreak - уникальное поле, по умолчанию pk.
+
+    Страницы остаются обычными объектами Page, у которых дополнительно
+    есть next_cursor и previous_cursor для ссылок ?cursor=.
+    Число объектов можно отдать функцией count, чтобы не делать COUNT(*).
+    Листать можно и словари из values(), если в них есть key и tiebreak.
+    """
+
+    def __init__(self, object_list, per_page, key='pub_date', count=None,
+                 tiebreak='pk', **kwargs):
+        super().__init__(
+            object_list.order_by(f'-{key}', f'-{tiebreak}'), per_page,
+            **kwargs
+        )
+        self.key = key
+        self.tiebreak = tiebreak
+        self.count_func = count
+
+    @cached_property
+    def count(self):
+        if self.count_func is None:
+            return super().count
+        return self.count_func()
+
+    @cached_property
+    def datetime_key(self):
+        """Ключ - дата: поле модели или аннотация (как score в поиске)."""
+        annotation = self.object_list.query.annotations.get(self.key)
+        if annotation is not None:
+            field = annotation.output_field
+        else:
+            field = self.object_list.model._meta.get_field(self.key)
+        return isinstance(field, DateTimeField)
+
+    @property
+    def last_cursor(self):
+        return encode_cursor(LAST, number=self.num_pages)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return self._build_page(
+            items[:self.per_page], number,
+            has_next=len(items) > self.per_page,
+            has_previous=number > 1,
+        )
+
+    def get_cursor_page(self, cursor):
+        """Возвращает страницу по токену, битый токен ведёт на первую."""
+        try:
+            direction, value, pk, number = decode_cursor(
+                cursor, self.datetime_key
+            )
+            if direction == LAST:
+                return self._last_page()
+            seek = self._seek(direction, value, pk)
+        except (ValueError, ValidationError):
+            return self.page(1)
+        if direction == NEXT:
+            items = list(seek[:self.per_page + 1])
+            return self._build_page(
+                items[:self.per_page], max(number, 2),
+                has_next=len(items) > self.per_page,
+                has_previous=True,
+            )
+        items = list(seek[:self.per_page + 1])
+        has_previous = len(items) > self.per_page
+        return self._build_page(
+            items[:self.per_page][::-1],
+            max(number, 2) if has_previous else 1,
+            has_next=True,
+            has_previous=has_previous,
+        )
+
+    def _seek(self, direction, value, pk):
+        key, tiebreak = self.key, self.tiebreak
+        if direction == NEXT:
+            return self.object_list.filter(
+                Q(**{f'{key}__lt': value})
+                | Q(**{key: value, f'{tiebreak}__lt': pk})
+            )
+        return self.object_list.filter(
+            Q(**{f'{key}__gt': value})
+            | Q(**{key: value, f'{tiebreak}__gt': pk})
+        ).order_by(key, tiebreak)
+
+    def _last_page(self):
+        number = self.num_pages
+        size = self.count - (number - 1) * self.per_page
+        if size <= 0:
+            size = self.per_page
+        items = list(
+            self.object_list.order_by(self.key, self.tiebreak)[:size + 1]
+        )
+        return self._build_page(
+            items[:size][::-1], number,
+            has_next=False,
+            has_previous=len(items) > size or number > 1,
+        )
+
+    def _build_page(self, items, number, has_next, has_previous):
+        page = self._get_page(items, number, self)
+        page.next_cursor = None
+        page.previous_cursor = None
+        if items and has_next:
+            page.next_cursor = self._cursor(NEXT, items[-1], number + 1)
+        if items and has_previous:
+            page.previous_cursor = self._cursor(
+                PREVIOUS, items[0], number - 1
+            )
+        return page
+
+    def _cursor(self, direction, item, number):
+        if isinstance(item, dict):
+            # Выборка через values() должна включать key и tiebreak.
+            return encode_cursor(
+                direction, item[self.key], item[self.tiebreak], number
+            )
+        return encode_cursor(
+            direction, getattr(item, self.key), getattr(item, self.tiebreak),
+            number,
+        )
@@ -0,0 +1,182 @@
+"""
+Рекомендации «на кого подписаться», посчитанные офлайн.
+
+Команда recommend_authors периодически (например, из cron) читает граф
+подписок и активность в группах целиком и сохраняет каждому пользователю
+RECOMMENDATIONS_PER_USER авторов в Recommendation. Страница читает
+готовый список одним запросом по индексу (user, -score).
+
+Данные хранятся разреженными матрицами {строка: {столбец: вес}}: numpy и
+scipy в проекте нет, поэтому произведения считаются на словарях и
+обходят только ненулевые элементы. Вес автора для пользователя u -
+сумма нормированных сигналов с весами RECOMMENDATION_WEIGHTS:
+
+* friends - на кого подписаны подписки u, строка u в A·A;
+* co_followed - на кого подписаны похожие на u читатели, (A·Aᵀ)·A,
+  где из A·Aᵀ оставлены RECOMMENDATION_NEIGHBOURS ближайших по
+  косинусу соседей;
+* groups - кто пишет в группах, где u пишет посты и комментарии.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from . import follow_graph, generations
+from .models import Comment, Follow, Post, Recommendation, User
+
+# Поколение рекомендаций пользователя: от него зависит ETag профиля.
+RECOMMENDATIONS = 'recommendations'
+
+
+def recommended_authors(user_id):
+    """
+    RECOMMENDATIONS_SHOWN авторов для user_id. Авторы, на которых он
+    подписался после расчёта, отбрасываются по графу подписок в кэше.
+    """
+    followees = set(follow_graph.followees(user_id))
+    recommendations = Recommendation.objects.filter(
+        user_id=user_id
+    ).exclude(author_id__in=followees).select_related(
+        'author', 'author__stats'
+    ).order_by('-score')[:settings.RECOMMENDATIONS_SHOWN]
+    return [recommendation.author for recommendation in recommendations]
+
+
+def recompute(batch_size=1000):
+    """
+    Пересчитывает рекомендации всех пользователей и заменяет старые
+    пачками по batch_size пользователей; возвращает число рекомендаций.
+    """
+    graph = Graph.load()
+    user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+    stored = 0
+    for start in range(0, len(user_ids), batch_size):
+        scores = {
+            user_id: graph.recommend(user_id)
+            for user_id in user_ids[start:start + batch_size]
+        }
+        stored += _store(scores)
+    return stored
+
+
+class Graph:
+    """Матрицы подписок и активности в группах для расчёта рекомендаций."""
+
+    def __init__(self, follows, activity, group_authors):
+        # A: пользователь -> автор, 1 за подписку.
+        self.follows = follows
+        # Aᵀ: автор -> подписчик.
+        self.followers = _transpose(follows)
+        # Пользователь -> группа: его постов и комментариев в группе.
+        self.activity = activity
+        # Группа -> автор: доля постов группы, которые написал автор.
+        self.group_authors = group_authors
+
+    @classmethod
+    def load(cls):
+        follows = defaultdict(dict)
+        for user_id, author_id in Follow.objects.values_list(
+            'user_id', 'author_id'
+        ).iterator():
+            follows[user_id][author_id] = 1
+        activity = defaultdict(Counter)
+        group_authors = defaultdict(dict)
+        for author_id, group_id, count in Post.objects.filter(
+            group__isnull=False
+        ).order_by().values_list('author_id', 'group_id').annotate(
+            Count('pk')
+        ):
+            activity[author_id][group_id] += count
+            group_authors[group_id][author_id] = count
+        for author_id, group_id, count in Comment.objects.filter(
+            post__group__isnull=False
+        ).order_by().values_list('author_id', 'post__group_id').annotate(
+            Count('pk')
+        ):
+            activity[author_id][group_id] += count
+        for authors in group_authors.values():
+            _scale(authors, 1 / sum(authors.values()))
+        return cls(follows, activity, group_authors)
+
+    def recommend(self, user_id):
+        """Лучшие RECOMMENDATIONS_PER_USER пар (автор, вес) для user_id."""
+        followees = self.follows.get(user_id, {})
+        exclude = {user_id, *followees}
+        activity = dict(self.activity.get(user_id, {}))
+        if activity:
+            _scale(activity, 1 / sum(activity.values()))
+        signals = {
+            'friends': _multiply(followees, self.follows),
+            'co_followed': _multiply(self.neighbours(user_id), self.follows),
+            'groups': _multiply(activity, self.group_authors),
+        }
+        scores = defaultdict(float)
+        for name, vector in signals.items():
+            for author_id in exclude:
+                vector.pop(author_id, None)
+            if not vector:
+                continue
+            weight = settings.RECOMMENDATION_WEIGHTS[name] / max(
+                vector.values()
+            )
+            for author_id, value in vector.items():
+                scores[author_id] += weight * value
+        return heapq.nlargest(
+            settings.RECOMMENDATIONS_PER_USER, scores.items(),
+            key=itemgetter(1),
+        )
+
+    def neighbours(self, user_id):
+        """Читатели с похожими подписками: строка u в A·Aᵀ по косинусу."""
+        followees = self.follows.get(user_id, {})
+        overlap = _multiply(followees, self.followers)
+        overlap.pop(user_id, None)
+        similarity = {
+            other_id: shared / math.sqrt(
+                len(followees) * len(self.follows[other_id])
+            )
+            for other_id, shared in overlap.items()
+        }
+        return dict(heapq.nlargest(
+            settings.RECOMMENDATION_NEIGHBOURS, similarity.items(),
+            key=itemgetter(1),
+        ))
+
+
+@transaction.atomic
+def _store(scores):
+    Recommendation.objects.filter(user_id__in=scores).delete()
+    created = Recommendation.objects.bulk_create(
+        Recommendation(user_id=user_id, author_id=author_id, score=score)
+        for user_id, authors in scores.items()
+        for author_id, score in authors
+    )
+    generations.bump(*((RECOMMENDATIONS, user_id) for user_id in scores))
+    return len(created)
+
+
+def _multiply(row, matrix):
+    """Вектор-строка на разреженную матрицу."""
+    result = defaultdict(float)
+    for key, weight in row.items():
+        for column, value in matrix.get(key, {}).items():
+            result[column] += weight * value
+    return result
+
+
+def _transpose(matrix):
+    result = defaultdict(dict)
+    for row, columns in matrix.items():
+        for column, value in columns.items():
+            result[column][row] = value
+    return result
+
+
+def _scale(row, factor):
+    for key in row:
+        row[key] *= factor
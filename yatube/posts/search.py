@@ -0,0 +1,158 @@
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import (
+    Case, Count, F, IntegerField, Sum, Value, When,
+)
+
+from .counters import feed_count
+from .feeds import INDEX, feed_queryset
+from .models import Comment, Post, SearchEntry
+from .stemmer import stem
+
+WORD = re.compile(r'\w+')
+STOP_WORDS = frozenset((
+    'и в во не что он на я с со как а то все она так его но да ты к у же '
+    'вы за бы по только ее мне было вот от меня еще нет о из ему теперь '
+    'когда даже ну ли если уже или ни быть был него до вас нибудь уж вам '
+    'ведь там потом себя ей может они тут где есть надо ней для мы тебя '
+    'их чем была сам чтоб без будто чего раз тоже себе под будет ж тогда '
+    'кто этот того потому этого какой ним здесь этом мой тем чтобы нее '
+    'были куда зачем всех при об хоть после над через эти нас про всего '
+    'них какая эту моя свою этой перед том такой им между'
+).split())
+# Слово в тексте поста весит больше, чем в комментарии к нему.
+POST_WEIGHT = 2
+COMMENT_WEIGHT = 1
+MAX_QUERY_TERMS = 10
+
+
+def terms(text):
+    """Основы значимых слов текста с числом вхождений."""
+    words = WORD.findall(text.lower().replace('ё', 'е'))
+    return Counter(
+        stem(word)[:64] for word in words
+        if len(word) > 1 and word not in STOP_WORDS
+    )
+
+
+def entries(text, weight, **fields):
+    return [
+        SearchEntry(term=term, weight=count * weight, **fields)
+        for term, count in terms(text).items()
+    ]
+
+
+def index_post(post):
+    SearchEntry.objects.filter(post_id=post.pk, comment=None).delete()
+    SearchEntry.objects.bulk_create(
+        entries(post.text, POST_WEIGHT, post_id=post.pk),
+        batch_size=settings.SEARCH_BATCH_SIZE,
+    )
+
+
+def index_comment(comment):
+    SearchEntry.objects.filter(comment_id=comment.pk).delete()
+    SearchEntry.objects.bulk_create(
+        entries(
+            comment.text, COMMENT_WEIGHT,
+            post_id=comment.post_id, comment_id=comment.pk,
+        ),
+        batch_size=settings.SEARCH_BATCH_SIZE,
+    )
+
+
+def rebuild():
+    """Переиндексирует все посты и комментарии; возвращает число записей."""
+    SearchEntry.objects.all().delete()
+    size = settings.SEARCH_BATCH_SIZE
+    total = 0
+    batch = []
+    for entry in _all_entries(size):
+        batch.append(entry)
+        if len(batch) >= size:
+            SearchEntry.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    SearchEntry.objects.bulk_create(batch)
+    return total + len(batch)
+
+
+def _all_entries(chunk_size):
+    posts = Post.objects.only('text').order_by()
+    for post in posts.iterator(chunk_size):
+        yield from entries(post.text, POST_WEIGHT, post_id=post.pk)
+    comments = Comment.objects.only('text', 'post_id').order_by()
+    for comment in comments.iterator(chunk_size):
+        yield from entries(
+            comment.text, COMMENT_WEIGHT,
+            post_id=comment.post_id, comment_id=comment.pk,
+        )
+
+
+def query_terms(query):
+    return list(terms(query))[:MAX_QUERY_TERMS]
+
+
+def term_weights(query_terms):
+    """
+    IDF слов запроса в сотых долях, чтобы счёт оставался целым и годился
+    для курсора пагинатора.
+    """
+    frequencies = dict(
+        SearchEntry.objects.filter(term__in=query_terms).order_by()
+        .values_list('term').annotate(Count('post', distinct=True))
+    )
+    total = max(feed_count(INDEX), 1)
+    return {
+        term: round(100 * math.log(1 + total / frequencies[term]))
+        for term in query_terms if term in frequencies
+    }
+
+
+def search_posts(query):
+    """
+    Посты, в которых (вместе с комментариями) есть все слова запроса.
+
+    У каждого поста есть score: сумма весов найденных слов, умноженных
+    на их IDF.
+    """
+    words = query_terms(query)
+    weights = term_weights(words)
+    if not words or len(weights) < len(words):
+        return feed_queryset().none().annotate(
+            score=Value(0, output_field=IntegerField())
+        )
+    return feed_queryset().filter(
+        search_entries__term__in=words
+    ).annotate(
+        score=Sum(Case(
+            *[
+                When(
+                    search_entries__term=term,
+                    then=F('search_entries__weight') * Value(weight),
+                )
+                for term, weight in weights.items()
+            ],
+            default=Value(0),
+            output_field=IntegerField(),
+        )),
+        matched=Count('search_entries__term', distinct=True),
+    ).filter(matched=len(words))
+
+
+def search_ids(query):
+    """pk найденных постов для фильтрации других выборок."""
+    return search_posts(query).order_by().values('pk')
+
+
+def search_comment_ids(query):
+    """pk комментариев, в тексте которых есть все слова запроса."""
+    words = query_terms(query)
+    return SearchEntry.objects.filter(
+        comment__isnull=False, term__in=words
+    ).order_by().values('comment').annotate(
+        matched=Count('term', distinct=True)
+    ).filter(matched=len(words) or -1).values('comment')
@@ -0,0 +1,118 @@
+from django.db.models import Count
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from . import counters, follow_graph, generations, search, timeline
+from .feeds import FOLLOW, POST, post_feeds
+from .models import Comment, Follow, Post, deleting_posts
+from .stats import change_comments_count, change_stats
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, **kwargs):
+    instance._saved_feeds = None
+    if not instance._state.adding:
+        instance._saved_feeds = Post.objects.filter(
+            pk=instance.pk
+        ).values('group_id', 'author_id').first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    feeds = {'group_id': instance.group_id, 'author_id': instance.author_id}
+    saved = instance._saved_feeds
+    generations.bump(*post_feeds(instance.pk, **feeds))
+    search.index_post(instance)
+    if saved and saved != feeds:
+        generations.bump(*post_feeds(instance.pk, **saved))
+    if created:
+        counters.change_count(1, **feeds)
+        change_stats(instance.author_id, 'posts_count', 1)
+        timeline.fan_out(instance)
+    elif saved and saved != feeds:
+        counters.change_count(-1, **saved)
+        counters.change_count(1, **feeds)
+        if saved['author_id'] != instance.author_id:
+            change_stats(saved['author_id'], 'posts_count', -1)
+            change_stats(instance.author_id, 'posts_count', 1)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # Остальные удаления (QuerySet.delete(), каскад от пользователя)
+    # списывают комментарии по одному в comment_deleted.
+    if instance.pk in deleting_posts.get():
+        instance._comment_authors = dict(
+            Comment.objects.filter(post_id=instance.pk).order_by()
+            .values_list('author_id').annotate(Count('pk'))
+        )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    generations.bump(*post_feeds(
+        instance.pk, group_id=instance.group_id, author_id=instance.author_id
+    ))
+    counters.change_count(
+        -1, group_id=instance.group_id, author_id=instance.author_id
+    )
+    change_stats(instance.author_id, 'posts_count', -1)
+    for author_id, count in getattr(
+        instance, '_comment_authors', {}
+    ).items():
+        change_stats(author_id, 'comments_count', -count)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    generations.bump((FOLLOW, instance.user_id))
+    follow_graph.refresh([instance.user_id], [instance.author_id])
+    if created:
+        change_stats(instance.user_id, 'following_count', 1)
+        change_stats(instance.author_id, 'followers_count', 1)
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    generations.bump((FOLLOW, instance.user_id))
+    follow_graph.refresh([instance.user_id], [instance.author_id])
+    change_stats(instance.user_id, 'following_count', -1)
+    change_stats(instance.author_id, 'followers_count', -1)
+    timeline.prune(instance.user_id, instance.author_id)
+    timeline.restore_fan_out([instance.author_id])
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    search.index_comment(instance)
+    if created:
+        change_stats(instance.author_id, 'comments_count', 1)
+        change_comments_count(instance.post_id, 1)
+    bump_comment_feeds(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id in deleting_posts.get():
+        return
+    change_stats(instance.author_id, 'comments_count', -1)
+    change_comments_count(instance.post_id, -1)
+    bump_comment_feeds(instance.post_id)
+
+
+def bump_comment_feeds(post_id):
+    """
+    Счётчик и последние комментарии видны в карточке поста, поэтому
+    комментарий сдвигает все ленты поста.
+    """
+    post = Post.objects.filter(pk=post_id).values(
+        'group_id', 'author_id'
+    ).first()
+    if post is None:
+        # Пост уже удалён.
+        generations.bump((POST, post_id))
+        return
+    generations.bump(*post_feeds(post_id, **post))
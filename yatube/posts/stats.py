@@ -0,0 +1,106 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, User, UserStats
+
+# Поле счётчика -> модель и её ссылка на пользователя.
+STATS_SOURCES = {
+    'posts_count': (Post, 'author'),
+    'following_count': (Follow, 'user'),
+    'followers_count': (Follow, 'author'),
+    'comments_count': (Comment, 'author'),
+}
+RECOUNT_CHUNK = 1000
+
+
+def change_stats(user_id, field, delta):
+    """Сдвигает счётчик одним UPDATE, недостающую запись пересчитывает."""
+    updated = UserStats.objects.filter(user_id=user_id).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+    # При удалении запись не создаём: пользователь может удаляться сам.
+    if not updated and delta > 0:
+        recount_stats([user_id])
+
+
+def change_stats_many(user_ids, field, delta):
+    """change_stats для многих пользователей одним UPDATE."""
+    user_ids = set(user_ids)
+    UserStats.objects.filter(user_id__in=user_ids).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+    if delta > 0:
+        recount_stats(user_ids - set(
+            UserStats.objects.filter(
+                user_id__in=user_ids
+            ).values_list('user_id', flat=True)
+        ))
+
+
+def change_comments_count(post_id, delta):
+    """Сдвигает Post.comments_count одним UPDATE."""
+    Post.objects.filter(pk=post_id).update(
+        comments_count=Greatest(F('comments_count') + delta, 0)
+    )
+
+
+def recount_comments(posts=None):
+    """Пересчитывает comments_count постов из posts (по умолчанию всех)."""
+    if posts is None:
+        posts = Post.objects.all()
+    return posts.order_by().update(comments_count=Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk')).order_by()
+        .values('post').annotate(total=Count('pk')).values('total')
+    ), 0))
+
+
+def get_stats(user):
+    """Статистика пользователя; user можно брать с select_related('stats')."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        recount_stats([user.pk])
+        # Запись только что создана в default, на репликах её ещё нет.
+        return UserStats.objects.using('default').get(user=user)
+
+
+def recount_stats(user_ids=None):
+    """Пересчитывает счётчики пачками по RECOUNT_CHUNK пользователей."""
+    if user_ids is None:
+        user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), RECOUNT_CHUNK):
+        _recount_chunk(user_ids[start:start + RECOUNT_CHUNK])
+    return len(user_ids)
+
+
+def _recount_chunk(user_ids):
+    # Счётчики пишутся в default, поэтому и считаются по default: реплика
+    # внутри @read_replica может отставать.
+    counts = {
+        field: dict(
+            model.objects.using('default')
+            .filter(**{f'{user_field}__in': user_ids})
+            .order_by().values_list(user_field).annotate(Count('pk'))
+        )
+        for field, (model, user_field) in STATS_SOURCES.items()
+    }
+    existing = set(
+        UserStats.objects.using('default').filter(
+            user_id__in=user_ids
+        ).values_list('user_id', flat=True)
+    )
+    stats = [
+        UserStats(user_id=user_id, **{
+            field: field_counts.get(user_id, 0)
+            for field, field_counts in counts.items()
+        })
+        for user_id in user_ids
+    ]
+    UserStats.objects.bulk_update(
+        [item for item in stats if item.user_id in existing],
+        list(STATS_SOURCES),
+    )
+    UserStats.objects.bulk_create(
+        [item for item in stats if item.user_id not in existing]
+    )
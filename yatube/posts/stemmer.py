@@ -0,0 +1,111 @@
+"""Стеммер Портера (Snowball) для русского языка."""
+
+VOWELS = 'аеиоуыэюя'
+
+
+def _endings(*groups):
+    """
+    Окончания группы от длинных к коротким; True у тех, что должны
+    стоять после «а» или «я».
+    """
+    endings = {}
+    for after_a, words in groups:
+        for ending in words.split():
+            endings[ending] = after_a
+    return tuple(sorted(endings.items(), key=lambda item: -len(item[0])))
+
+
+PERFECTIVE_GERUND = _endings(
+    (True, 'в вши вшись'),
+    (False, 'ив ивши ившись ыв ывши ывшись'),
+)
+ADJECTIVE = _endings((False, (
+    'ее ие ые ое ими ыми ей ий ый ой ем им ым ом его ого ему ому их ых '
+    'ую юю ая яя ою ею'
+)))
+PARTICIPLE = _endings(
+    (True, 'ем нн вш ющ щ'),
+    (False, 'ивш ывш ующ'),
+)
+REFLEXIVE = _endings((False, 'ся сь'))
+VERB = _endings(
+    (True, 'ла на ете йте ли й л ем н ло но ет ют ны ть ешь нно'),
+    (False, (
+        'ила ыла ена ейте уйте ите или ыли ей уй ил ыл им ым ен ило ыло '
+        'ено ят ует уют ит ыт ены ить ыть ишь ую ю'
+    )),
+)
+NOUN = _endings((False, (
+    'а ев ов ие ье е иями ями ами еи ии и ией ей ой ий й иям ям ием ем '
+    'ам ом о у ах иях ях ы ь ию ью ю ия ья я'
+)))
+SUPERLATIVE = _endings((False, 'ейш ейше'))
+DERIVATIONAL = _endings((False, 'ост ость'))
+
+
+def _regions(word):
+    """Начала областей RV и R2 из описания алгоритма."""
+    rv = r1 = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i - 1] in VOWELS and word[i] not in VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i - 1] in VOWELS and word[i] not in VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _strip(word, region, endings):
+    """
+    Отрезает самое длинное окончание из endings, лежащее в области;
+    None, если такого нет.
+    """
+    for ending, after_a in endings:
+        start = len(word) - len(ending)
+        if start < region or not word.endswith(ending):
+            continue
+        if after_a and not (start > region and word[start - 1] in 'ая'):
+            return None
+        return word[:start]
+    return None
+
+
+def stem(word):
+    """Основа русского слова; остальные слова возвращаются как есть."""
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = _regions(word)
+    if rv == len(word):
+        return word
+    stripped = _strip(word, rv, PERFECTIVE_GERUND)
+    if stripped is None:
+        word = _first(_strip(word, rv, REFLEXIVE), word)
+        adjective = _strip(word, rv, ADJECTIVE)
+        if adjective is not None:
+            word = _first(_strip(adjective, rv, PARTICIPLE), adjective)
+        else:
+            word = _first(
+                _strip(word, rv, VERB), _strip(word, rv, NOUN), word
+            )
+    else:
+        word = stripped
+    if word.endswith('и') and len(word) > rv:
+        word = word[:-1]
+    word = _first(_strip(word, r2, DERIVATIONAL), word)
+    superlative = _strip(word, rv, SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        word = word[:-1]
+    elif superlative is None and word.endswith('ь') and len(word) > rv:
+        word = word[:-1]
+    return word
+
+
+def _first(*words):
+    return next(word for word in words if word is not None)
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+POST_CHANGELIST = reverse('admin:posts_post_changelist')
+COMMENT_CHANGELIST = reverse('admin:posts_comment_changelist')
+FOLLOW_CHANGELIST = reverse('admin:posts_follow_changelist')
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        cls.admin_client = Client()
+        cls.admin_client.force_login(cls.admin)
+
+    def add_rows(self, count):
+        start = Post.objects.count()
+        for i in range(start, start + count):
+            author = User.objects.create(username=f'author_{i}')
+            group = Group.objects.create(title=f'group_{i}', slug=f'g{i}')
+            post = Post.objects.create(author=author, group=group, text='t')
+            Comment.objects.create(author=author, post=post, text='c')
+            Follow.objects.create(user=self.admin, author=author)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            self.admin_client.get(url)
+        return len(context.captured_queries)
+
+    def test_queries_do_not_depend_on_rows(self):
+        """Число запросов списка не растёт с числом строк."""
+        self.add_rows(2)
+        before = {
+            url: self.changelist_queries(url)
+            for url in (POST_CHANGELIST, COMMENT_CHANGELIST, FOLLOW_CHANGELIST)
+        }
+        self.add_rows(5)
+        for url, queries in before.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    response = self.admin_client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    @override_settings(FEED_COUNT_EXACT_LIMIT=3)
+    def test_count_is_bounded(self):
+        """Список не считает строки дальше FEED_COUNT_EXACT_LIMIT."""
+        self.add_rows(5)
+        response = self.admin_client.get(POST_CHANGELIST)
+        self.assertEqual(response.context['cl'].result_count, 4)
+        self.assertNotContains(response, 'Всего')
+
+    def test_list_editable_group(self):
+        """Группу можно сменить прямо в списке постов."""
+        self.add_rows(2)
+        post, other = Post.objects.order_by('pk')
+        response = self.admin_client.get(POST_CHANGELIST)
+        self.assertContains(
+            response, f'<option value="{post.group_id}" selected>'
+        )
+        forms = response.context['cl'].formset.forms
+        data = {
+            'form-TOTAL_FORMS': len(forms),
+            'form-INITIAL_FORMS': len(forms),
+            '_save': 'Сохранить',
+        }
+        for i, form in enumerate(forms):
+            data[f'form-{i}-id'] = form.instance.pk
+            data[f'form-{i}-group'] = other.group_id
+        self.admin_client.post(POST_CHANGELIST, data)
+        post.refresh_from_db()
+        self.assertEqual(post.group_id, other.group_id)
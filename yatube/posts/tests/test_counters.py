@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..counters import feed_count
+from ..feeds import AUTHOR, FOLLOW, GROUP, INDEX
+from ..models import Follow, Group, Post, User
+
+
+class FeedCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='auth')
+        cls.follower = User.objects.create(username='follower')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.group_2 = Group.objects.create(
+            title='test_group_2',
+            slug='test_slug_2',
+            description='test_description_2',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=str(i))
+            for i in range(3)
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def feeds(self):
+        return [
+            feed_count(INDEX),
+            feed_count(GROUP, self.group.pk),
+            feed_count(GROUP, self.group_2.pk),
+            feed_count(AUTHOR, self.user.pk),
+            feed_count(FOLLOW, self.follower.pk),
+        ]
+
+    def test_counts_are_cached(self):
+        """Повторный подсчёт лент не делает COUNT(*) по постам."""
+        self.assertEqual(self.feeds(), [3, 3, 0, 3, 3])
+        # Подписки берутся из графа в кэше, запросов нет совсем.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.feeds(), [3, 3, 0, 3, 3])
+
+    def test_counts_follow_post_changes(self):
+        """Счётчики сдвигаются при создании, переносе и удалении поста."""
+        self.feeds()
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='new'
+        )
+        self.assertEqual(self.feeds(), [4, 4, 0, 4, 4])
+        post.group = self.group_2
+        post.save()
+        self.assertEqual(self.feeds(), [4, 3, 1, 4, 4])
+        post.delete()
+        # Подписки берутся из графа в кэше, запросов нет совсем.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.feeds(), [3, 3, 0, 3, 3])
+
+    @override_settings(FEED_COUNT_EXACT_LIMIT=2)
+    def test_count_is_bounded(self):
+        """Выше порога COUNT(*) не идёт дальше лимита."""
+        self.assertEqual(feed_count(INDEX), 3)
@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from .. import follow_graph
+from ..models import Follow, User
+from ..moderation import delete_without_signals
+
+USERNAME = 'auth'
+FOLLOW = reverse('posts:profile_follow', args=[USERNAME])
+UNFOLLOW = reverse('posts:profile_unfollow', args=[USERNAME])
+PROFILE = reverse('posts:profile', args=[USERNAME])
+
+
+class FollowGraphTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username=USERNAME)
+        self.reader = User.objects.create(username='reader')
+        self.friend = User.objects.create(username='friend')
+        Follow.objects.create(user=self.reader, author=self.friend)
+        Follow.objects.create(user=self.friend, author=self.reader)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_lookups_without_sql(self):
+        """После первого чтения граф отвечает без запросов к базе."""
+        follow_graph.followees_many([self.reader.pk, self.friend.pk])
+        follow_graph.followers_count(self.friend.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                follow_graph.is_following(self.reader.pk, self.friend.pk)
+            )
+            self.assertFalse(
+                follow_graph.is_following(self.reader.pk, self.author.pk)
+            )
+            self.assertEqual(
+                follow_graph.mutuals(self.reader.pk), [self.friend.pk]
+            )
+            self.assertEqual(follow_graph.followers_count(self.friend.pk), 1)
+        self.assertEqual(
+            list(follow_graph.followees(self.reader.pk)), [self.friend.pk]
+        )
+
+    def test_follow_views_write_through(self):
+        """Подписка и отписка сразу видны в графе и в профиле."""
+        self.assertFalse(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+        self.assertEqual(follow_graph.followers_count(self.author.pk), 0)
+        self.client.get(FOLLOW)
+        self.assertTrue(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+        self.assertEqual(follow_graph.followers_count(self.author.pk), 1)
+        self.assertTrue(self.client.get(PROFILE).context['following'])
+        self.client.get(UNFOLLOW)
+        self.assertFalse(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+        self.assertFalse(self.client.get(PROFILE).context['following'])
+
+    def test_follow_with_stale_graph(self):
+        """Устаревший граф в кэше не мешает подписаться заново."""
+        self.client.get(FOLLOW)
+        follow_graph.followees(self.reader.pk)
+        delete_without_signals(Follow.objects.filter(author=self.author))
+        self.assertTrue(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+        self.client.get(FOLLOW)
+        self.assertTrue(
+            Follow.objects.filter(
+                user=self.reader, author=self.author
+            ).exists()
+        )
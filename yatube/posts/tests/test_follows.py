@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import follow_graph
+from ..follows import follow_many, unfollow_many
+from ..models import Follow, Post, TimelineEntry, User, UserStats
+
+FOLLOW_BULK = reverse('posts:follow_bulk')
+FOLLOW_SUGGESTIONS = reverse('posts:follow_suggestions')
+FOLLOW_INDEX = reverse('posts:follow_index')
+SIGNUP = reverse('users:signup')
+
+
+class BulkFollowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='newbie')
+        self.authors = [
+            User.objects.create(username=f'author_{i}') for i in range(6)
+        ]
+        for author in self.authors:
+            Post.objects.create(author=author, text='text')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def usernames(self, authors):
+        return [author.username for author in authors]
+
+    def test_follow_many(self):
+        """Подписки, счётчики, лента и граф обновляются за один проход."""
+        authors = self.authors[:3]
+        self.assertEqual(
+            follow_many(self.user.pk, self.usernames(authors) + ['missing']),
+            3,
+        )
+        self.assertEqual(follow_many(self.user.pk, ['author_0']), 0)
+        self.assertEqual(
+            Follow.objects.filter(user=self.user).count(), 3
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=self.user).following_count, 3
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=authors[0]).followers_count, 1
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.user).count(), 3
+        )
+        self.assertTrue(
+            follow_graph.is_following(self.user.pk, authors[0].pk)
+        )
+        self.assertEqual(unfollow_many(self.user.pk, ['author_0']), 1)
+        self.assertFalse(
+            follow_graph.is_following(self.user.pk, authors[0].pk)
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.user).count(), 2
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=authors[0]).followers_count, 0
+        )
+
+    def test_stale_graph_does_not_inflate_counts(self):
+        """Подписки, которых нет в кэше графа, не считаются второй раз."""
+        follow_graph.followees(self.user.pk)
+        # bulk_create обходит сигналы, и граф в кэше устаревает.
+        Follow.objects.bulk_create([
+            Follow(user=self.user, author=author)
+            for author in self.authors[:2]
+        ])
+        self.assertEqual(
+            follow_many(self.user.pk, self.usernames(self.authors[:3])), 1
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=self.authors[0]).followers_count, 0
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=self.authors[2]).followers_count, 1
+        )
+
+    def test_queries_do_not_depend_on_authors(self):
+        """Число запросов не растёт с числом авторов в списке."""
+        other = User.objects.create(username='other')
+        with CaptureQueriesContext(connection) as context:
+            follow_many(other.pk, self.usernames(self.authors[:2]))
+        with self.assertNumQueries(len(context.captured_queries)):
+            follow_many(self.user.pk, self.usernames(self.authors))
+
+    def test_follow_bulk_view(self):
+        """Галочки и текстовый список подписывают на всех авторов сразу."""
+        response = self.client.post(FOLLOW_BULK, {
+            'usernames': ['author_0', 'author_1', 'author_2, author_3'],
+        })
+        self.assertRedirects(response, FOLLOW_INDEX)
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(
+            len(self.client.get(FOLLOW_INDEX).context['page_obj']), 4
+        )
+        suggested = self.client.get(FOLLOW_SUGGESTIONS).context['authors']
+        self.assertEqual(
+            self.usernames(suggested), ['author_4', 'author_5']
+        )
+        self.client.post(FOLLOW_BULK, {
+            'usernames': 'author_0\nauthor_1', 'unfollow': '1',
+        })
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 2)
+
+    @override_settings(FOLLOW_BULK_LIMIT=2)
+    def test_follow_bulk_limit(self):
+        """Слишком длинный список не принимается."""
+        response = self.client.post(FOLLOW_BULK, {
+            'usernames': self.usernames(self.authors[:3]),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors)
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+
+    def test_signup_suggests_authors(self):
+        """После регистрации пользователь входит и видит авторов."""
+        response = Client().post(SIGNUP, {
+            'username': 'fresh',
+            'password1': 'Very-secret-42',
+            'password2': 'Very-secret-42',
+        }, follow=True)
+        self.assertRedirects(response, FOLLOW_SUGGESTIONS)
+        self.assertEqual(response.context['user'].username, 'fresh')
+        self.assertTrue(response.context['authors'])
@@ -4,6 +4,7 @@ import tempfile
 from django import forms
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template.defaultfilters import filesizeformat
 from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 
@@ -101,6 +102,21 @@ class PostFormTests(TestCase):
         self.assertEqual(form_data['group'], post.group.pk)
         self.assertEqual(f'{DIR_NAME}{form_data["image"]}', post.image.name)
         self.assertEqual(self.user, post.author)
+        self.assertEqual(post.image_status, Post.IMAGE_PROCESSING)
+
+    @override_settings(FILE_UPLOAD_MAX_SIZE=len(TEST_IMAGE) - 1)
+    def test_oversized_image_rejected(self):
+        """Картинка больше FILE_UPLOAD_MAX_SIZE не принимается формой"""
+        post_count = Post.objects.count()
+        response = self.authorized_client.post(POST_CREATE, data={
+            'text': 'New_post',
+            'image': self.create_image('huge.gif', TEST_IMAGE, 'image/gif'),
+        })
+        self.assertEqual(Post.objects.count(), post_count)
+        self.assertFormError(
+            response, 'form', 'image',
+            f'Картинка больше {filesizeformat(len(TEST_IMAGE) - 1)}.'
+        )
 
     def test_edit_post(self):
         """Проверка сохранения поста после редактирования"""
@@ -0,0 +1,53 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from ..feeds import AUTHOR, GROUP, INDEX, feed_queryset
+from ..models import Follow, Group, Post, User
+
+POST_ORDERING = ('-pub_date', '-pk')
+ORDERING = {
+    'post_pub_date_idx': POST_ORDERING,
+    'post_group_pub_date_idx': POST_ORDERING,
+    'post_author_pub_date_idx': POST_ORDERING,
+    'comment_post_created_idx': ('-created', '-pk'),
+}
+
+
+class FeedIndexesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='auth')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='test_text'
+        )
+
+    def test_feeds_use_indexes(self):
+        """План запросов каждой ленты идёт по своему индексу."""
+        cases = [
+            [feed_queryset(INDEX), 'post_pub_date_idx'],
+            [feed_queryset(GROUP, self.group.pk), 'post_group_pub_date_idx'],
+            [feed_queryset(AUTHOR, self.user.pk), 'post_author_pub_date_idx'],
+            [self.post.comments.all(), 'comment_post_created_idx'],
+        ]
+        for queryset, index in cases:
+            with self.subTest(index=index):
+                self.assertIn(index, queryset.order_by(
+                    *ORDERING[index]
+                )[:10].explain())
+
+    def test_follow_is_unique(self):
+        """Повторная подписка запрещена и проверяется по индексу."""
+        author = User.objects.create(username='author')
+        Follow.objects.create(user=self.user, author=author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.user, author=author)
+        self.assertIn(
+            'INDEX',
+            Follow.objects.filter(user=self.user, author=author).explain()
+        )
@@ -0,0 +1,135 @@
+from django.contrib.admin import helpers
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import moderation
+from ..admin import MOVE_TO_GROUP_TEMPLATE
+from ..counters import feed_count
+from ..feeds import AUTHOR, GROUP, INDEX
+from ..generations import get_generations
+from ..models import (
+    Comment, Follow, Group, Post, SearchEntry, TimelineEntry, User, UserStats,
+)
+
+POST_CHANGELIST = reverse('admin:posts_post_changelist')
+COMMENT_CHANGELIST = reverse('admin:posts_comment_changelist')
+
+
+class ModerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.spammer = User.objects.create(username='spammer')
+        self.reader = User.objects.create(username='reader')
+        self.group = Group.objects.create(title='group', slug='group')
+        self.other_group = Group.objects.create(title='other', slug='other')
+        Follow.objects.create(user=self.reader, author=self.spammer)
+        self.good_post = Post.objects.create(
+            author=self.reader, group=self.group, text='хорошая новость'
+        )
+        Comment.objects.create(
+            author=self.spammer, post=self.good_post, text='реклама'
+        )
+
+    def add_spam(self, count, author=None):
+        for i in range(count):
+            post = Post.objects.create(
+                author=author or self.spammer, group=self.group,
+                text=f'спам {i}',
+            )
+            Comment.objects.create(
+                author=self.reader, post=post, text='ответ на спам'
+            )
+
+    def stats(self, user):
+        stats = UserStats.objects.get(user=user)
+        return [stats.posts_count, stats.comments_count]
+
+    def test_delete_user_content(self):
+        """Контент пользователя удаляется, счётчики и ленты сдвигаются."""
+        self.add_spam(3)
+        counts = [feed_count(INDEX), feed_count(GROUP, self.group.pk)]
+        generation = get_generations((AUTHOR, self.spammer.pk))
+        self.assertEqual(
+            moderation.delete_user_content([self.spammer.pk]), (3, 1)
+        )
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
+        self.assertFalse(Comment.objects.filter(author=self.spammer).exists())
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader))
+        self.assertFalse(SearchEntry.objects.filter(term='реклам').exists())
+        self.assertEqual(
+            [feed_count(INDEX), feed_count(GROUP, self.group.pk)],
+            [counts[0] - 3, counts[1] - 3],
+        )
+        self.assertEqual(self.stats(self.spammer), [0, 0])
+        self.assertEqual(self.stats(self.reader), [1, 0])
+        self.good_post.refresh_from_db()
+        self.assertEqual(self.good_post.comments_count, 0)
+        self.assertNotEqual(
+            get_generations((AUTHOR, self.spammer.pk)), generation
+        )
+
+    def test_queries_do_not_depend_on_rows(self):
+        """Пачка удаляется одним набором запросов, а не построчно."""
+        other = User.objects.create(username='other_spammer')
+        self.add_spam(2)
+        self.add_spam(6, author=other)
+        with CaptureQueriesContext(connection) as context:
+            moderation.delete_posts(Post.objects.filter(author=self.spammer))
+        with self.assertNumQueries(len(context.captured_queries)):
+            moderation.delete_posts(Post.objects.filter(author=other))
+
+    def test_move_to_group(self):
+        """Посты переносятся в группу, счётчики групп сдвигаются."""
+        self.add_spam(2)
+        counts = [
+            feed_count(GROUP, self.group.pk),
+            feed_count(GROUP, self.other_group.pk),
+        ]
+        moved = moderation.move_to_group(
+            Post.objects.filter(author=self.spammer), self.other_group
+        )
+        self.assertEqual(moved, 2)
+        self.assertEqual(
+            [feed_count(GROUP, self.group.pk),
+             feed_count(GROUP, self.other_group.pk)],
+            [counts[0] - 2, counts[1] + 2],
+        )
+        cache.clear()
+        self.assertEqual(feed_count(GROUP, self.other_group.pk), 2)
+
+    def test_admin_actions(self):
+        """Действия админки: перенос через форму и очистка комментариев."""
+        self.add_spam(2)
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        spam = list(Post.objects.filter(
+            author=self.spammer
+        ).values_list('pk', flat=True))
+        data = {
+            'action': 'move_to_group',
+            helpers.ACTION_CHECKBOX_NAME: spam,
+        }
+        response = client.post(POST_CHANGELIST, data)
+        self.assertTemplateUsed(response, MOVE_TO_GROUP_TEMPLATE)
+        client.post(POST_CHANGELIST, {
+            **data, 'group': self.other_group.pk, 'apply': 'Перенести',
+        })
+        self.assertEqual(
+            Post.objects.filter(group=self.other_group).count(), 2
+        )
+        client.post(POST_CHANGELIST, {
+            'action': 'purge_comments', 'index': 0,
+            helpers.ACTION_CHECKBOX_NAME: spam,
+        })
+        self.assertFalse(Comment.objects.filter(post_id__in=spam).exists())
+        client.post(COMMENT_CHANGELIST, {
+            'action': 'delete_authors_content', 'index': 0,
+            helpers.ACTION_CHECKBOX_NAME: Comment.objects.values_list(
+                'pk', flat=True
+            ),
+        })
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
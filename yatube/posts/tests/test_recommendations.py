@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, Recommendation, User
+from ..recommendations import recommended_authors, recompute
+
+FOLLOW_INDEX = reverse('posts:follow_index')
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.friend, self.neighbour = (
+            User.objects.create(username=name)
+            for name in ('user', 'friend', 'neighbour')
+        )
+        # friend_of_friend - через подписку friend, co_followed - у
+        # похожего читателя neighbour, group_author - пишет в группе,
+        # где комментирует user.
+        self.friend_of_friend, self.co_followed, self.group_author = (
+            User.objects.create(username=name)
+            for name in ('friend_of_friend', 'co_followed', 'group_author')
+        )
+        Follow.objects.bulk_create([
+            Follow(user=self.user, author=self.friend),
+            Follow(user=self.friend, author=self.friend_of_friend),
+            Follow(user=self.neighbour, author=self.friend),
+            Follow(user=self.neighbour, author=self.co_followed),
+        ])
+        group = Group.objects.create(title='group', slug='group')
+        post = Post.objects.create(
+            author=self.group_author, group=group, text='пост в группе'
+        )
+        Comment.objects.create(author=self.user, post=post, text='отзыв')
+
+    def recommended(self, user):
+        return list(Recommendation.objects.filter(
+            user=user
+        ).order_by('-score', 'author_id').values_list('author', flat=True))
+
+    def test_signals(self):
+        """Рекомендации собираются из всех сигналов без себя и подписок."""
+        recompute()
+        self.assertCountEqual(self.recommended(self.user), [
+            self.friend_of_friend.pk, self.co_followed.pk,
+            self.group_author.pk,
+        ])
+        self.assertEqual(
+            self.recommended(self.neighbour), [self.friend_of_friend.pk]
+        )
+
+    def test_recompute_replaces_rows(self):
+        """Пересчёт заменяет старые рекомендации, а не дописывает их."""
+        Recommendation.objects.create(
+            user=self.user, author=self.neighbour, score=100
+        )
+        recompute(batch_size=2)
+        self.assertNotIn(self.neighbour.pk, self.recommended(self.user))
+        self.assertEqual(
+            Recommendation.objects.filter(user=self.user).count(), 3
+        )
+
+    def test_served_in_one_query(self):
+        """Страница читает готовый список одним запросом."""
+        recompute()
+        # Первый вызов кладёт подписки пользователя в кэш графа.
+        expected = recommended_authors(self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(recommended_authors(self.user.pk), expected)
+
+    def test_pages(self):
+        """Рекомендации видны в ленте подписок и пропадают после подписки."""
+        call_command('recommend_authors', stdout=StringIO())
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(FOLLOW_INDEX)
+        self.assertIn(self.co_followed, response.context['recommendations'])
+        profile = reverse('posts:profile', args=[self.group_author.username])
+        response = client.get(profile)
+        self.assertIn(self.co_followed, response.context['recommendations'])
+        Follow.objects.create(user=self.user, author=self.co_followed)
+        response = client.get(profile)
+        self.assertNotIn(
+            self.co_followed, response.context['recommendations']
+        )
+        self.assertEqual(Client().get(profile).context['recommendations'], ())
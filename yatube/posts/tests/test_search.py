@@ -0,0 +1,105 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Post, SearchEntry, User
+from ..paginators import NEXT, encode_cursor
+from ..search import search_posts
+from ..stemmer import stem
+
+SEARCH = reverse('posts:search')
+
+
+class StemmerTests(TestCase):
+    def test_russian_stems(self):
+        """Словоформы сводятся к одной основе."""
+        for words in (
+            ('книга', 'книги', 'книгой'),
+            ('красивая', 'красивые', 'красивого'),
+            ('туманность', 'туманности'),
+        ):
+            with self.subTest(words=words):
+                self.assertEqual(len({stem(word) for word in words}), 1)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        # Счётчик общей ленты из кэша идёт в IDF.
+        cache.clear()
+        self.user = User.objects.create(username='auth')
+        self.cats = Post.objects.create(
+            author=self.user, text='Кошки любят тёплые книги'
+        )
+        self.dogs = Post.objects.create(
+            author=self.user, text='Собаки любят прогулки, прогулки и кошку'
+        )
+        self.comment = Comment.objects.create(
+            post=self.dogs, author=self.user, text='А ещё собаки грызут книгу'
+        )
+
+    def found(self, query):
+        return list(search_posts(query).order_by('-score', '-pk'))
+
+    def test_word_forms_found(self):
+        """Поиск находит другие словоформы в постах и комментариях."""
+        self.assertEqual(self.found('кошка'), [self.dogs, self.cats])
+        self.assertEqual(self.found('книгами собак'), [self.dogs])
+        self.assertEqual(self.found('бегемоты'), [])
+
+    def test_ranking(self):
+        """Слова поста весят больше, чем слова комментариев."""
+        self.assertEqual(self.found('прогулкам'), [self.dogs])
+        self.assertEqual(self.found('книга'), [self.cats, self.dogs])
+
+    def test_index_follows_edits(self):
+        """Правка и удаление текстов сразу видны в поиске."""
+        self.cats.text = 'Кошки спят'
+        self.cats.save()
+        self.assertEqual(self.found('книга'), [self.dogs])
+        self.comment.delete()
+        self.assertEqual(self.found('книга'), [])
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        SearchEntry.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.found('книга'), [self.cats, self.dogs])
+
+    @override_settings(POSTS_ON_PAGE=1)
+    def test_search_page(self):
+        """Страница поиска листается курсором и не теряет запрос."""
+        response = Client().get(SEARCH, {'q': 'кошки'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), [self.dogs])
+        self.assertContains(response, 'q=%D0%BA%D0%BE%D1%88%D0%BA%D0%B8&')
+        response = Client().get(
+            SEARCH, {'q': 'кошки', 'cursor': page_obj.next_cursor}
+        )
+        self.assertEqual(list(response.context['page_obj']), [self.cats])
+        self.assertEqual(response.context['page_obj'].number, 2)
+        response = Client().get(SEARCH, {
+            'q': 'кошки',
+            'cursor': encode_cursor(NEXT, '2022-01-01T00:00:00', 1),
+        })
+        self.assertEqual(list(response.context['page_obj']), [self.dogs])
+
+    def test_admin_search(self):
+        """Поиск в админке идёт по индексу, а не по icontains."""
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'кошкам'}
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list), {self.cats, self.dogs}
+        )
+        response = client.get(
+            reverse('admin:posts_comment_changelist'), {'q': 'книги собак'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.comment]
+        )
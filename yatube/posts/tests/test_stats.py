@@ -0,0 +1,119 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models.signals import pre_delete
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.replicas import read_replica
+from ..models import Comment, Follow, Post, User, UserStats
+from ..stats import get_stats
+
+USERNAME = 'auth'
+PROFILE = reverse('posts:profile', args=[USERNAME])
+
+
+class UserStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        cls.follower = User.objects.create(username='follower')
+        cls.post = Post.objects.create(author=cls.user, text='test_text')
+        Comment.objects.create(
+            author=cls.user, post=cls.post, text='comment_text'
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        cls.guest_client = Client()
+
+    def assertStats(self, user, expected):
+        stats = UserStats.objects.get(user=user)
+        self.assertEqual(
+            [stats.posts_count, stats.following_count,
+             stats.followers_count, stats.comments_count],
+            expected
+        )
+
+    def test_stats_follow_changes(self):
+        """Счётчики обновляются сигналами Post, Follow и Comment."""
+        self.assertStats(self.user, [1, 0, 1, 1])
+        self.assertStats(self.follower, [0, 1, 0, 0])
+        Follow.objects.filter(user=self.follower).delete()
+        Comment.objects.all().delete()
+        Post.objects.create(author=self.user, text='test_text_2')
+        self.assertStats(self.user, [2, 0, 0, 0])
+        self.assertStats(self.follower, [0, 0, 0, 0])
+
+    def test_recount_stats_command(self):
+        """Команда recount_stats чинит разошедшиеся счётчики."""
+        UserStats.objects.update(posts_count=100, followers_count=100)
+        UserStats.objects.filter(user=self.follower).delete()
+        call_command('recount_stats', stdout=StringIO())
+        self.assertStats(self.user, [1, 0, 1, 1])
+        self.assertStats(self.follower, [0, 1, 0, 0])
+
+    def test_profile_reads_stats(self):
+        """Профиль берёт счётчики из записи статистики."""
+        UserStats.objects.filter(user=self.user).update(comments_count=7)
+        response = self.guest_client.get(PROFILE)
+        self.assertEqual(response.context['stats'].comments_count, 7)
+
+    @override_settings(DATABASE_REPLICAS=['lagging'])
+    def test_missing_stats_with_replica(self):
+        """Недостающая статистика считается и читается в основной базе."""
+        UserStats.objects.filter(user=self.user).delete()
+        user = User.objects.select_related('stats').get(pk=self.user.pk)
+        # Алиаса lagging нет: любое чтение из реплики упадёт.
+        stats = read_replica(lambda request: get_stats(user))(
+            RequestFactory().get('/')
+        )
+        self.assertEqual(stats.posts_count, 1)
+
+    def test_post_delete_queries_do_not_depend_on_comments(self):
+        """Комментарии удалённого поста списываются разом по авторам."""
+        posts = []
+        for count in (1, 5):
+            post = Post.objects.create(author=self.user, text='text')
+            for i in range(count):
+                Comment.objects.create(
+                    author=self.follower, post=post, text=f'comment {i}'
+                )
+            posts.append(post)
+        with CaptureQueriesContext(connection) as context:
+            posts[0].delete()
+        self.assertStats(self.follower, [0, 1, 0, 5])
+        with self.assertNumQueries(len(context.captured_queries)):
+            posts[1].delete()
+        self.assertStats(self.follower, [0, 1, 0, 0])
+        self.assertStats(self.user, [1, 0, 1, 1])
+
+    def test_failed_post_delete_keeps_comment_counters(self):
+        """После упавшего удаления поста его комментарии снова учитываются."""
+        def fail(**kwargs):
+            raise DatabaseError
+
+        pre_delete.connect(fail, sender=Post)
+        self.addCleanup(pre_delete.disconnect, fail, sender=Post)
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            self.post.delete()
+        pre_delete.disconnect(fail, sender=Post)
+        Comment.objects.get(post=self.post).delete()
+        self.assertStats(self.user, [1, 0, 1, 0])
+        self.assertEqual(
+            Post.objects.get(pk=self.post.pk).comments_count, 0
+        )
+
+    def test_post_comments_count(self):
+        """Post.comments_count следует за комментариями и пересчётом."""
+        comment = Comment.objects.create(
+            author=self.follower, post=self.post, text='second'
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+        comment.delete()
+        Post.objects.update(comments_count=100)
+        call_command('recount_stats', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
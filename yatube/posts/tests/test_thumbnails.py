@@ -0,0 +1,136 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post, User
+from ..thumbnails import make_derivatives, process_image
+
+INDEX = reverse('posts:index')
+TEST_IMAGE = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR),
+    POST_IMAGE_WORKERS=0,
+)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='auth')
+        cls.post = Post.objects.create(
+            text='test_text',
+            author=cls.user,
+            image=SimpleUploadedFile(
+                name='small.gif', content=TEST_IMAGE, content_type='image/gif'
+            ),
+        )
+        cls.guest_client = Client()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_thumbnail_url_saved(self):
+        """Адрес готовой миниатюры сохраняется в посте и идёт в ленту."""
+        url = make_derivatives(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertTrue(url)
+        self.assertTrue(url.endswith('.jpg'))
+        self.assertEqual(self.post.image_thumbnail, url)
+        self.assertContains(self.guest_client.get(INDEX), url)
+
+    def test_srcset_rendered(self):
+        """В ленте картинка отдаётся через <picture> с srcset по форматам."""
+        make_derivatives(self.post.pk)
+        self.post.refresh_from_db()
+        types = [mime for mime, srcset in self.post.image_srcsets]
+        self.assertIn('image/webp', types)
+        self.assertIn('image/jpeg', types)
+        response = self.guest_client.get(INDEX)
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, '-2.webp 2w')
+
+    def test_small_image_not_upscaled(self):
+        """Картинка уже самой узкой ширины остаётся своего размера."""
+        url = make_derivatives(self.post.pk)
+        self.assertIn('-2.jpg', url)
+        with default_storage.open(
+            url[len(settings.MEDIA_URL):]
+        ) as thumbnail:
+            self.assertEqual(Image.open(thumbnail).size, (2, 1))
+
+    def test_generate_thumbnails_command(self):
+        """Команда generate_thumbnails нарезает недостающие миниатюры."""
+        Post.objects.update(image_thumbnail='')
+        call_command(
+            'generate_thumbnails', processes=0, stdout=StringIO()
+        )
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.image_thumbnail)
+
+    def test_exif_stripped(self):
+        """После обработки в картинке не остаётся EXIF."""
+        image = Image.new('RGB', (40, 20))
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        content = BytesIO()
+        image.save(content, 'JPEG', exif=exif)
+        post = Post.objects.create(
+            text='exif', author=self.user,
+            image=SimpleUploadedFile('exif.jpg', content.getvalue()),
+            image_status=Post.IMAGE_PROCESSING,
+        )
+        process_image(post.pk)
+        post.refresh_from_db()
+        self.assertEqual(post.image_status, Post.IMAGE_READY)
+        with post.image.open('rb') as image_file:
+            image = Image.open(image_file)
+            self.assertFalse(image.getexif())
+            # Ориентация 6 поворачивает картинку на 90 градусов.
+            self.assertEqual(image.size, (20, 40))
+
+    def test_broken_image_dropped(self):
+        """Битая картинка убирается из поста, а пост остаётся."""
+        post = Post.objects.create(
+            text='broken', author=self.user,
+            image=SimpleUploadedFile('broken.gif', TEST_IMAGE[:20]),
+            image_status=Post.IMAGE_PROCESSING,
+        )
+        with self.assertLogs('posts.thumbnails', 'WARNING') as logs:
+            process_image(post.pk)
+        self.assertEqual(logs.output, [
+            f'WARNING:posts.thumbnails:Битая картинка {post.image.name} '
+            f'у поста {post.pk}'
+        ])
+        post.refresh_from_db()
+        self.assertEqual(post.image_status, Post.IMAGE_FAILED)
+        self.assertFalse(post.image)
+
+    def test_processing_image_hidden(self):
+        """Пока картинка обрабатывается, исходник в ленте не показан."""
+        Post.objects.filter(pk=self.post.pk).update(
+            image_thumbnail='', image_status=Post.IMAGE_PROCESSING
+        )
+        # update() не трогает поколения лент, сбрасываем кэш вручную.
+        cache.clear()
+        response = self.guest_client.get(INDEX)
+        self.assertContains(response, 'Картинка обрабатывается')
+        self.assertNotContains(response, self.post.image.url)
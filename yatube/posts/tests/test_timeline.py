@@ -0,0 +1,71 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..feeds import FOLLOW, feed_queryset
+from ..models import Follow, Post, TimelineEntry, User
+
+FOLLOW_INDEX = reverse('posts:follow_index')
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='follower')
+        cls.author = User.objects.create(username='author')
+        cls.other = User.objects.create(username='other')
+        cls.old_post = Post.objects.create(author=cls.author, text='old')
+        Post.objects.create(author=cls.other, text='other')
+
+    def follow_feed(self):
+        return list(feed_queryset(FOLLOW, self.user.pk))
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка добавляет посты автора в ленту, отписка убирает."""
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(self.follow_feed(), [self.old_post])
+        Follow.objects.filter(user=self.user).delete()
+        self.assertEqual(self.follow_feed(), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленты подписчиков автора."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(author=self.author, text='new')
+        self.assertEqual(self.follow_feed(), [post, self.old_post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_celebrity_posts_merged_on_read(self):
+        """Посты популярных авторов не раздаются, а читаются напрямую."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(author=self.author, text='new')
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.follow_feed(), [post, self.old_post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=2)
+    def test_former_celebrity_posts_kept(self):
+        """Посты, написанные выше порога, остаются в ленте после спада."""
+        Follow.objects.create(user=self.user, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        post = Post.objects.create(author=self.author, text='new')
+        self.assertEqual(self.follow_feed(), [post, self.old_post])
+        Follow.objects.filter(user=self.other).delete()
+        self.assertEqual(self.follow_feed(), [post, self.old_post])
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.user, post=post
+        ).exists())
+
+    @override_settings(POSTS_ON_PAGE=1)
+    def test_follow_page_cursor(self):
+        """Курсор ленты подписок листает записи TimelineEntry."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(author=self.author, text='new')
+        client = Client()
+        client.force_login(self.user)
+        first_page = client.get(FOLLOW_INDEX).context['page_obj']
+        self.assertEqual(list(first_page), [post])
+        second_page = client.get(
+            FOLLOW_INDEX, {'cursor': first_page.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(second_page), [self.old_post])
+        self.assertIsNone(second_page.next_cursor)
@@ -7,7 +7,8 @@ from django.conf import settings
 from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 
-from ..models import Post, Group, User, Follow
+from ..models import Comment, Post, Group, User, Follow
+from ..paginators import LAST, NEXT, encode_cursor
 
 INDEX = reverse('posts:index')
 POST_CREATE = reverse('posts:post_create')
@@ -82,19 +83,23 @@ class PostURLTests(TestCase):
         shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
         super().tearDownClass()
 
+    def setUp(self):
+        # Откат базы не сдвигает поколения лент, без очистки страницы
+        # приходили бы из кэша страниц без контекста.
+        cache.clear()
+
     def test_index_cache(self):
         "Тестирование cache на странице index.html"
         response = self.guest_client.get(INDEX)
-        Post.objects.all().delete()
-        response_after_delete_posts = self.guest_client.get(INDEX)
-        cache.clear()
-        response_after_cache_clean = self.guest_client.get(INDEX)
-        self.assertEqual(
-            response.content, response_after_delete_posts.content
-        )
+        Post.objects.update(text='changed_text')
+        response_after_update = self.guest_client.get(INDEX)
+        Post.objects.create(text='new_text', author=self.user)
+        response_after_create = self.guest_client.get(INDEX)
+        self.assertEqual(response.content, response_after_update.content)
         self.assertNotEqual(
-            response_after_cache_clean.content, response.content
+            response_after_create.content, response.content
         )
+        self.assertContains(response_after_create, 'changed_text')
 
     def test_index_group_profile_correct_contexts(self):
         """
@@ -187,6 +192,10 @@ class PaginatorViewsTest(TestCase):
         cls.authorized_client2 = Client()
         cls.authorized_client2.force_login(cls.user2)
 
+    def setUp(self):
+        # bulk_create не шлёт сигналы, счётчики лент считаются заново.
+        cache.clear()
+
     def test_posts_on_page_count(self):
         Follow.objects.create(user=self.user2, author=self.user)
         posts_on_second_page = Post.objects.count() - settings.POSTS_ON_PAGE
@@ -212,3 +221,234 @@ class PaginatorViewsTest(TestCase):
                 self.assertEqual(
                     len(response.context['page_obj']), posts_on_page
                 )
+
+    def test_pages_cached_separately(self):
+        """Фрагмент ленты кэшируется для каждой страницы отдельно."""
+        for url in [INDEX, GROUP_POSTS, PROFILE]:
+            with self.subTest(url=url):
+                first_page = self.authorized_client.get(url)
+                second_page = self.authorized_client.get(f'{url}?page=2')
+                self.assertNotEqual(first_page.content, second_page.content)
+                self.assertContains(second_page, '>2<')
+
+    def test_cursor_pagination(self):
+        """Переходы по ?cursor= отдают те же страницы, что и ?page=."""
+        first_page = self.authorized_client.get(INDEX).context['page_obj']
+        second_page = self.authorized_client.get(
+            f'{INDEX}?cursor={first_page.next_cursor}'
+        ).context['page_obj']
+        self.assertEqual(second_page.number, 2)
+        self.assertIsNone(second_page.next_cursor)
+        self.assertEqual(
+            list(second_page),
+            list(self.authorized_client.get(
+                f'{INDEX}?page=2'
+            ).context['page_obj'])
+        )
+        cases = [
+            [second_page.previous_cursor, list(first_page)],
+            [first_page.paginator.last_cursor, list(second_page)],
+            ['broken-cursor', list(first_page)],
+            # Подделанные значения ключа.
+            *(
+                [encode_cursor(NEXT, value, 1), list(first_page)]
+                for value in (1, 1.5, True, [], {}, 'not-a-date')
+            ),
+            # Номер страницы и pk за пределами 64 бит.
+            *(
+                [encode_cursor(direction, first_page[0].pub_date, pk, number),
+                 list(first_page)]
+                for direction, pk, number in (
+                    (NEXT, 1, 1e999), (LAST, None, 1e999),
+                    (NEXT, 2 ** 63, 2),
+                )
+            ),
+        ]
+        for cursor, posts in cases:
+            with self.subTest(cursor=cursor):
+                response = self.authorized_client.get(
+                    f'{INDEX}?cursor={cursor}'
+                )
+                self.assertEqual(list(response.context['page_obj']), posts)
+
+
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCR,
+        )
+        authors = [
+            User.objects.create(username=f'author_{i}')
+            for i in range(settings.POSTS_ON_PAGE)
+        ]
+        Post.objects.bulk_create(
+            Post(author=author, group=cls.group, text=TEST_TEXT)
+            for author in authors
+        )
+        for author in authors:
+            Follow.objects.create(user=cls.user, author=author)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_query_count(self):
+        """Число запросов на страницу ленты не зависит от числа постов."""
+        cases = [
+            [INDEX, 4],
+            [GROUP_POSTS, 6],
+            [FOLLOW_INDEX, 7],
+        ]
+        for url, queries in cases:
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    response = self.authorized_client.get(url)
+                self.assertEqual(
+                    len(response.context['page_obj']), settings.POSTS_ON_PAGE
+                )
+
+    def test_latest_comments_one_query(self):
+        """Последние комментарии всех постов страницы - один запрос."""
+        for post in Post.objects.all():
+            for i in range(settings.FEED_COMMENTS_PREVIEW + 1):
+                Comment.objects.create(
+                    author=self.user, post=post, text=f'comment_{i}'
+                )
+        cache.clear()
+        with self.assertNumQueries(5):
+            response = self.authorized_client.get(INDEX)
+        for post in response.context['page_obj']:
+            with self.subTest(post=post.pk):
+                self.assertEqual(
+                    post.comments_count, settings.FEED_COMMENTS_PREVIEW + 1
+                )
+                self.assertEqual(
+                    [comment.text for comment in post.latest_comments()],
+                    ['comment_3', 'comment_2', 'comment_1'],
+                )
+        self.assertContains(response, 'comment_3')
+        self.assertNotContains(response, 'comment_0')
+
+
+class ConditionalViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE, slug=GROUP_SLUG, description=GROUP_DESCR,
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text=TEST_TEXT
+        )
+        cls.POST_DETAIL = reverse('posts:post_detail', args=[cls.post.pk])
+        cls.guest_client = Client()
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_not_modified(self):
+        """Неизменная страница отдаёт 304 по ETag и Last-Modified."""
+        for url in (INDEX, GROUP_POSTS, PROFILE, self.POST_DETAIL):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(
+                    self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    ).status_code, 304
+                )
+                if response.has_header('Last-Modified'):
+                    self.assertEqual(
+                        self.guest_client.get(
+                            url,
+                            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+                        ).status_code, 304
+                    )
+
+    def test_changes_modify_etag(self):
+        """Новый пост и комментарий меняют ETag страниц."""
+        etags = {
+            url: self.guest_client.get(url)['ETag']
+            for url in (INDEX, GROUP_POSTS, PROFILE)
+        }
+        Post.objects.create(author=self.user, group=self.group, text='new')
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    ).status_code, 200
+                )
+        etag = self.guest_client.get(self.POST_DETAIL)['ETag']
+        Comment.objects.create(post=self.post, author=self.user, text='new')
+        self.assertEqual(
+            self.guest_client.get(
+                self.POST_DETAIL, HTTP_IF_NONE_MATCH=etag
+            ).status_code, 200
+        )
+
+    def test_profile_etag_follows_comments_count(self):
+        """Комментарий к чужому посту меняет ETag профиля комментатора."""
+        other_post = Post.objects.create(
+            author=User.objects.create(username='other'), text='other'
+        )
+        etag = self.guest_client.get(PROFILE)['ETag']
+        Comment.objects.create(post=other_post, author=self.user, text='new')
+        response = self.guest_client.get(PROFILE, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['stats'].comments_count, 1)
+
+    def test_cache_headers(self):
+        """Анонимам страница кэшируется публично, пользователям - нет."""
+        response = self.guest_client.get(INDEX)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        response = self.authorized_client.get(INDEX)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertNotEqual(
+            response['ETag'], self.guest_client.get(INDEX)['ETag']
+        )
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        cls.post = Post.objects.create(author=cls.user, text=TEST_TEXT)
+        cls.guest_client = Client()
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_shared_with_holes(self):
+        """Закэшированная страница получает шапку текущего пользователя."""
+        guest_page = self.guest_client.get(INDEX)
+        self.assertIn('page_obj', guest_page.context)
+        with self.assertNumQueries(2):
+            # Только сессия и пользователь для шапки.
+            user_page = self.authorized_client.get(INDEX)
+        self.assertContains(user_page, TEST_TEXT)
+        self.assertContains(user_page, 'Новая запись')
+        self.assertContains(user_page, 'Избранные авторы')
+        self.assertNotContains(user_page, 'Регистрация')
+        self.assertNotContains(user_page, '<!--hole:')
+        self.assertNotContains(self.guest_client.get(INDEX), 'Новая запись')
+
+    def test_new_post_invalidates_page(self):
+        """Новый пост сразу виден на закэшированной странице."""
+        self.guest_client.get(INDEX)
+        Post.objects.create(author=self.user, text='new_text')
+        self.assertContains(self.guest_client.get(INDEX), 'new_text')
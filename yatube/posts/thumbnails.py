@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from . import generations
+from .feeds import post_feeds
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Пропорции прежней миниатюры 960x339.
+ASPECT_RATIO = 339 / 960
+FORMATS = {
+    'AVIF': ('image/avif', 'avif'),
+    'WEBP': ('image/webp', 'webp'),
+    'JPEG': ('image/jpeg', 'jpg'),
+}
+DERIVATIVES_DIR = 'posts/derivatives'
+
+_executor = None
+
+
+def schedule(post):
+    """После коммита отдаёт пост пулу, который нарежет картинки."""
+    transaction.on_commit(lambda: submit(post.pk))
+
+
+def submit(post_id):
+    """Возвращает Future, а без пула (POST_IMAGE_WORKERS = 0) режет сразу."""
+    global _executor
+    if not settings.POST_IMAGE_WORKERS:
+        process_image(post_id)
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            settings.POST_IMAGE_WORKERS, thread_name_prefix='thumbnails'
+        )
+    return _executor.submit(run, post_id)
+
+
+def run(post_id):
+    try:
+        process_image(post_id)
+    except Exception:
+        logger.exception('Не удалось нарезать картинки поста %s', post_id)
+    finally:
+        connections.close_all()
+
+
+def process_image(post_id):
+    """
+    Проверяет загруженную картинку целиком, убирает EXIF и режет размеры.
+
+    Пока это не сделано, пост показывается с картинкой в состоянии
+    «обрабатывается»; битая картинка удаляется из поста.
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'group_id', 'author_id'
+    ).first()
+    if post is None or not post.image:
+        return None
+    name = post.image.name
+    try:
+        strip_exif(post.image)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        logger.warning('Битая картинка %s у поста %s', name, post_id)
+        Post.objects.filter(pk=post_id, image=name).update(
+            image='', image_status=Post.IMAGE_FAILED
+        )
+        post.image.delete(save=False)
+        generations.bump(*post_feeds(post.pk, post.group_id, post.author_id))
+        return None
+    return make_derivatives(post_id)
+
+
+def strip_exif(field_file):
+    """
+    Полностью декодирует картинку; если в ней есть EXIF, поворачивает её
+    по ориентации и пересохраняет под тем же именем уже без метаданных.
+    """
+    with field_file.open('rb') as image_file:
+        image = Image.open(image_file)
+        image.load()
+    if not image.getexif() and 'exif' not in image.info:
+        return
+    image_format = image.format
+    image = ImageOps.exif_transpose(image)
+    content = BytesIO()
+    image.save(content, image_format, quality=settings.POST_IMAGE_QUALITY)
+    storage, name = field_file.storage, field_file.name
+    storage.delete(name)
+    saved = storage.save(name, ContentFile(content.getvalue()))
+    if saved != name:
+        # Пока писали, имя успели занять, тогда оставляем то, что выдали.
+        Post.objects.filter(image=name).update(image=saved)
+        field_file.name = saved
+
+
+def saved_formats():
+    """Форматы из POST_IMAGE_FORMATS, которые умеет сохранять Pillow."""
+    Image.init()
+    return [
+        image_format for image_format in settings.POST_IMAGE_FORMATS
+        if image_format in Image.SAVE and image_format in FORMATS
+    ]
+
+
+def make_derivatives(post_id):
+    """
+    Нарезает картинку поста по ширинам POST_IMAGE_WIDTHS во всех форматах.
+
+    В Post.image_sources пишутся srcset по форматам, в image_thumbnail -
+    JPEG шириной до 960 для <img src>.
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'group_id', 'author_id'
+    ).first()
+    if post is None or not post.image:
+        return None
+    with post.image.open('rb') as image_file:
+        image = Image.open(image_file)
+        image.load()
+    image = image.convert('RGB')
+    # Картинки не увеличиваются: узкая остаётся своей ширины.
+    widths = [
+        width for width in settings.POST_IMAGE_WIDTHS if width <= image.width
+    ] or [image.width]
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    sources = []
+    fallback = None
+    for image_format in saved_formats():
+        mime, extension = FORMATS[image_format]
+        srcset = []
+        for width in widths:
+            url = _save(
+                _resize(image, width), image_format,
+                f'{DERIVATIVES_DIR}/{post.pk}/{stem}-{width}.{extension}'
+            )
+            srcset.append(f'{url} {width}w')
+            if image_format == 'JPEG' and (fallback is None or width <= 960):
+                fallback = url
+        sources.append([mime, ', '.join(srcset)])
+    # Пока картинки резались, исходник могли заменить.
+    Post.objects.filter(pk=post_id, image=post.image.name).update(
+        image_thumbnail=fallback or '',
+        image_sources=json.dumps(sources),
+        image_status=Post.IMAGE_READY,
+    )
+    generations.bump(*post_feeds(post.pk, post.group_id, post.author_id))
+    return fallback
+
+
+def _resize(image, width):
+    height = round(width * ASPECT_RATIO)
+    scale = min(width / image.width, height / image.height, 1)
+    return image.resize(
+        (max(1, round(image.width * scale)),
+         max(1, round(image.height * scale))),
+        Image.LANCZOS,
+    )
+
+
+def _save(image, image_format, name):
+    content = BytesIO()
+    image.save(content, image_format, quality=settings.POST_IMAGE_QUALITY)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.url(
+        default_storage.save(name, ContentFile(content.getvalue()))
+    )
@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+
+from .models import Follow, Post, TimelineEntry, UserStats
+
+
+def is_celebrity(author_id):
+    """У автора столько подписчиков, что его посты не раздаются в ленты."""
+    followers = UserStats.objects.filter(
+        user_id=author_id
+    ).values_list('followers_count', flat=True).first()
+    return (followers or 0) >= settings.TIMELINE_FANOUT_LIMIT
+
+
+def celebrity_followees(user_id):
+    return list(Follow.objects.filter(
+        user_id=user_id,
+        author__stats__followers_count__gte=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('author_id', flat=True))
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков пачками."""
+    if is_celebrity(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).order_by().values_list('user_id', flat=True)
+    _bulk_insert(
+        TimelineEntry(
+            user_id=user_id, post=post, author_id=post.author_id,
+            pub_date=post.pub_date,
+        )
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика последние TIMELINE_BACKFILL постов."""
+    if is_celebrity(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'pk', 'pub_date'
+    )[:settings.TIMELINE_BACKFILL]
+    _bulk_insert(
+        TimelineEntry(
+            user_id=user_id, post_id=post_id, author_id=author_id,
+            pub_date=pub_date,
+        )
+        for post_id, pub_date in posts
+    )
+
+
+def backfill_many(user_id, author_ids):
+    """backfill сразу для многих авторов: один запрос постов на всех."""
+    author_ids = set(author_ids) - set(UserStats.objects.filter(
+        user_id__in=author_ids,
+        followers_count__gte=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('user_id', flat=True))
+    if not author_ids:
+        return
+    latest = Post.objects.filter(
+        author_id=OuterRef('author_id')
+    ).order_by('-pub_date', '-pk').values('pk')[:settings.TIMELINE_BACKFILL]
+    posts = Post.objects.filter(
+        author_id__in=author_ids, pk__in=Subquery(latest)
+    ).order_by().values_list('pk', 'author_id', 'pub_date')
+    _bulk_insert(
+        TimelineEntry(
+            user_id=user_id, post_id=post_id, author_id=author_id,
+            pub_date=pub_date,
+        )
+        for post_id, author_id, pub_date in posts.iterator()
+    )
+
+
+def restore_fan_out(author_ids):
+    """
+    Авторы author_ids только что потеряли подписчиков. Кто из них опустился
+    ниже TIMELINE_FANOUT_LIMIT, больше не подмешивается при чтении, а его
+    посты, написанные выше порога, не раздавались: их последние
+    TIMELINE_BACKFILL раскладываются по лентам всех подписчиков.
+    """
+    demoted = UserStats.objects.filter(
+        user_id__in=author_ids,
+        followers_count=settings.TIMELINE_FANOUT_LIMIT - 1,
+    ).values_list('user_id', flat=True)
+    for author_id in demoted:
+        posts = list(Post.objects.filter(author_id=author_id).values_list(
+            'pk', 'pub_date'
+        )[:settings.TIMELINE_BACKFILL])
+        followers = Follow.objects.filter(
+            author_id=author_id
+        ).order_by().values_list('user_id', flat=True)
+        _bulk_insert(
+            TimelineEntry(
+                user_id=user_id, post_id=post_id, author_id=author_id,
+                pub_date=pub_date,
+            )
+            for user_id in followers.iterator()
+            for post_id, pub_date in posts
+        )
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild(user_ids):
+    """Собирает ленты заново, например после bulk_create подписок."""
+    for user_id in user_ids:
+        TimelineEntry.objects.filter(user_id=user_id).delete()
+        for author_id in Follow.objects.filter(
+            user_id=user_id
+        ).values_list('author_id', flat=True):
+            backfill(user_id, author_id)
+
+
+def _bulk_insert(entries):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) == settings.TIMELINE_BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
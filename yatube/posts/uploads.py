@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import (
+    SkipFile, TemporaryFileUploadHandler,
+)
+
+# Сюда обработчик складывает имена полей, файлы которых оказались больше
+# FILE_UPLOAD_MAX_SIZE.
+OVERSIZED = 'oversized_uploads'
+
+
+def oversized_uploads(request):
+    """Поля запроса, файлы которых отброшены из-за размера."""
+    return getattr(request, OVERSIZED, ())
+
+
+class IncomingUploadedFile(TemporaryUploadedFile):
+    """
+    Загруженный файл, который сразу пишется в каталог медиа.
+
+    FileSystemStorage при сохранении переносит такой файл на место
+    переименованием, без повторного копирования.
+    """
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + ext, dir=incoming_dir()
+        )
+        super(TemporaryUploadedFile, self).__init__(
+            file, name, content_type, size, charset, content_type_extra
+        )
+
+
+def incoming_dir():
+    try:
+        path = default_storage.path(settings.FILE_UPLOAD_INCOMING_DIR)
+    except NotImplementedError:
+        # Удалённое хранилище: пишем во временный каталог, как Django.
+        return settings.FILE_UPLOAD_TEMP_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class StreamingUploadHandler(TemporaryFileUploadHandler):
+    """Пишет файл по частям и обрывает его на FILE_UPLOAD_MAX_SIZE байтах."""
+
+    def new_file(self, *args, **kwargs):
+        super(TemporaryFileUploadHandler, self).new_file(*args, **kwargs)
+        self.file = IncomingUploadedFile(
+            self.file_name, self.content_type, 0, self.charset,
+            self.content_type_extra,
+        )
+        # Заявленному размеру верить нельзя, но если он уже больше
+        # лимита, не стоит читать файл.
+        if (self.content_length or 0) > settings.FILE_UPLOAD_MAX_SIZE:
+            self.reject()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.FILE_UPLOAD_MAX_SIZE:
+            self.reject()
+        self.file.write(raw_data)
+
+    def reject(self):
+        rejected = getattr(self.request, OVERSIZED, set())
+        rejected.add(self.field_name)
+        setattr(self.request, OVERSIZED, rejected)
+        raise SkipFile()
@@ -20,12 +20,21 @@ urlpatterns = [
     path('posts/<int:post_id>/comment/',
          views.add_comment,
          name='add_comment'),
+    path('search/',
+         views.search,
+         name='search'),
     path('create/',
          views.post_create,
          name='post_create'),
     path('follow/',
          views.follow_index,
          name='follow_index'),
+    path('follow/suggestions/',
+         views.follow_suggestions,
+         name='follow_suggestions'),
+    path('follow/bulk/',
+         views.follow_bulk,
+         name='follow_bulk'),
     path('profile/<str:username>/follow/',
          views.profile_follow,
          name='profile_follow'),
@@ -1,71 +1,216 @@
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.shortcuts import render, redirect
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_POST
+
+from core.page_cache import page_cache
+from core.replicas import pin_primary, read_replica
 
-from .forms import PostForm, CommentForm
+from . import follow_graph, thumbnails
+from .comments import attach_latest_comments, comment_queryset
+from .conditional import (
+    conditional_page, feed_last_modified, page_etag, post_last_modified,
+)
+from .follows import follow_many, unfollow_many
+from .forms import BulkFollowForm, PostForm, CommentForm
+from .counters import bounded_count, feed_count
+from .feeds import (
+    AUTHOR, FOLLOW, GROUP, INDEX, POST, feed_key, feed_queryset,
+)
+from .generations import feed_version, fragment_cache
 from .models import Post, Group, User, Follow
+from .paginators import KeysetPaginator
+from .recommendations import RECOMMENDATIONS, recommended_authors
+from .search import search_posts
+from .stats import get_stats
+from .uploads import oversized_uploads
+
+
+def paginator_page(request, objects_list, key='pub_date', count=None,
+                   tiebreak='pk'):
+    paginator = KeysetPaginator(
+        objects_list, settings.POSTS_ON_PAGE, key=key, count=count,
+        tiebreak=tiebreak,
+    )
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return paginator.get_cursor_page(cursor)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def feed_page(request, feed, owner=None):
+    key, tiebreak = feed_key(feed)
+    page = paginator_page(
+        request, feed_queryset(feed, owner), key=key, tiebreak=tiebreak,
+        count=partial(feed_count, feed, owner)
+    )
+    attach_latest_comments(page.object_list)
+    return page
+
+
+def index_etag(request):
+    return page_etag(request, INDEX)
+
+
+def index_last_modified(request):
+    return feed_last_modified(INDEX)
+
 
+def group_id(request, slug):
+    """pk группы; ETag и Last-Modified берут его с запроса."""
+    if not hasattr(request, 'group_id'):
+        request.group_id = Group.objects.filter(slug=slug).values_list(
+            'pk', flat=True
+        ).first()
+    return request.group_id
 
-def paginator_page(request, objects_list):
-    return (
-        Paginator(
-            objects_list,
-            settings.POSTS_ON_PAGE).get_page(request.GET.get('page'))
+
+def group_etag(request, slug):
+    owner = group_id(request, slug)
+    return owner and page_etag(request, GROUP, owner)
+
+
+def group_last_modified(request, slug):
+    owner = group_id(request, slug)
+    return owner and feed_last_modified(GROUP, owner)
+
+
+def profile_etag(request, username):
+    # Счётчики профиля и подписка на автора меняются без новых постов,
+    # поэтому у профиля нет Last-Modified.
+    author = User.objects.filter(username=username).values_list(
+        'pk', 'stats__posts_count', 'stats__following_count',
+        'stats__followers_count', 'stats__comments_count',
+    ).first()
+    if author is None:
+        return None
+    owner, *stats = author
+    viewer = request.user.pk
+    feeds = [(FOLLOW, viewer), (RECOMMENDATIONS, viewer)] if viewer else []
+    return page_etag(request, AUTHOR, owner, *feeds, extra=stats)
+
+
+def post_etag(request, post_id):
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    return author_id and page_etag(
+        request, POST, post_id, (AUTHOR, author_id)
     )
 
 
+def post_detail_last_modified(request, post_id):
+    return post_last_modified(post_id)
+
+
+def index_version(request):
+    return feed_version(request, INDEX)
+
+
+def group_version(request, slug):
+    owner = group_id(request, slug)
+    return owner and feed_version(request, GROUP, owner)
+
+
+@read_replica
+@conditional_page(index_etag, index_last_modified)
+@page_cache(index_version)
 def index(request):
     return render(request, 'posts/index.html', {
-        'page_obj': paginator_page(request, Post.objects.all())
+        'page_obj': feed_page(request, INDEX),
+        'feed_cache': fragment_cache(request, INDEX),
     })
 
 
+@read_replica
+@conditional_page(group_etag, group_last_modified)
+@page_cache(group_version)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     return render(request, 'posts/group_list.html', {
         'group': group,
-        'page_obj': paginator_page(request, group.posts.all()),
+        'page_obj': feed_page(request, GROUP, group.pk),
+        'feed_cache': fragment_cache(request, GROUP, group.pk),
     })
 
 
+@read_replica
+@conditional_page(profile_etag)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
     following = (
-        request.user.is_authenticated
-        and request.user != user
-        and Follow.objects.filter(user=request.user, author=user).exists()
+        request.user != user
+        and follow_graph.is_following(request.user.pk, user.pk)
     )
     return render(request, 'posts/profile.html', {
         'author': user,
+        'stats': get_stats(user),
         'following': following,
-        'page_obj': paginator_page(request, user.posts.all()),
+        'recommendations': (
+            recommended_authors(request.user.pk)
+            if request.user.is_authenticated else ()
+        ),
+        'page_obj': feed_page(request, AUTHOR, user.pk),
+        'feed_cache': fragment_cache(request, AUTHOR, user.pk),
+    })
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = search_posts(query)
+    return render(request, 'posts/search.html', {
+        'query': query,
+        'page_obj': paginator_page(
+            request, posts, key='score', count=partial(bounded_count, posts)
+        ) if query else None,
     })
 
 
+@read_replica
+@conditional_page(post_etag, post_detail_last_modified)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id
+    )
     context = {
         'post': post,
+        'author_stats': get_stats(post.author),
         'form': CommentForm(request.POST or None, files=request.FILES or None),
-        'comments': paginator_page(request, post.comments.all()),
+        'comments': paginator_page(
+            request, comment_queryset().filter(post=post), key='created'
+        ),
+        'feed_cache': fragment_cache(request, POST, post.pk),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@pin_primary
 def post_create(request):
-    form = PostForm(request.POST or None, files=request.FILES or None)
+    form = PostForm(
+        request.POST or None,
+        files=request.FILES or None,
+        oversized=oversized_uploads(request),
+    )
     if not form.is_valid():
         return render(request, 'posts/create_post.html', {'form': form})
     post = form.save(commit=False)
     post.author = request.user
+    if post.image:
+        post.image_status = Post.IMAGE_PROCESSING
     post.save()
+    if post.image:
+        thumbnails.schedule(post)
     return redirect('posts:profile', username=request.user)
 
 
 @login_required
+@pin_primary
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if request.user != post.author:
@@ -73,18 +218,26 @@ def post_edit(request, post_id):
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
-        instance=post
+        instance=post,
+        oversized=oversized_uploads(request),
     )
     if not form.is_valid():
         return render(request, 'posts/create_post.html', {
             'post': post,
             'form': form,
         })
+    image_changed = 'image' in form.changed_data
+    if image_changed:
+        post.image_thumbnail = post.image_sources = ''
+        post.image_status = Post.IMAGE_PROCESSING if post.image else ''
     form.save()
+    if image_changed and post.image:
+        thumbnails.schedule(post)
     return redirect('posts:post_detail', post_id)
 
 
 @login_required
+@pin_primary
 def add_comment(request, post_id):
     form = CommentForm(request.POST or None)
     if form.is_valid():
@@ -96,24 +249,72 @@ def add_comment(request, post_id):
 
 
 @login_required
+@read_replica
 def follow_index(request):
-    follow_posts = Post.objects.filter(author__following__user=request.user)
-    return render(
-        request, 'posts/follow.html',
-        {'page_obj': paginator_page(request, follow_posts)}
-    )
+    return render(request, 'posts/follow.html', {
+        'recommendations': recommended_authors(request.user.pk),
+        'page_obj': feed_page(request, FOLLOW, request.user.pk),
+        # Посты в ленту подписок приходят из всех лент, поэтому ключ
+        # зависит и от поколения общей ленты.
+        'feed_cache': fragment_cache(
+            request, FOLLOW, request.user.pk, (INDEX, None)
+        ),
+    })
 
 
 @login_required
+@pin_primary
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
+    # Граф в кэше может отставать, поэтому проверку делает сама база.
     if author != request.user:
         Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:profile', username=author.username)
 
 
 @login_required
+@pin_primary
 def profile_unfollow(request, username):
     get_object_or_404(
         Follow, user=request.user, author__username=username).delete()
     return redirect('posts:profile', username=username)
+
+
+def suggested_authors(user):
+    """Популярные авторы, на которых user ещё не подписан."""
+    return User.objects.exclude(
+        pk__in=[user.pk, *follow_graph.followees(user.pk)]
+    ).select_related('stats').order_by(
+        '-stats__followers_count', 'pk'
+    )[:settings.FOLLOW_SUGGESTIONS]
+
+
+@login_required
+def follow_suggestions(request):
+    return render(request, 'posts/follow_suggestions.html', {
+        'authors': suggested_authors(request.user),
+        'form': BulkFollowForm(),
+    })
+
+
+@login_required
+@pin_primary
+@require_POST
+def follow_bulk(request):
+    """
+    Подписка на список авторов из отмеченных галочек или из текста;
+    с полем unfollow - отписка.
+    """
+    form = BulkFollowForm({
+        'usernames': '\n'.join(request.POST.getlist('usernames')),
+    })
+    if not form.is_valid():
+        return render(request, 'posts/follow_suggestions.html', {
+            'authors': suggested_authors(request.user),
+            'form': form,
+        })
+    if 'unfollow' in request.POST:
+        unfollow_many(request.user.pk, form.cleaned_data['usernames'])
+    else:
+        follow_many(request.user.pk, form.cleaned_data['usernames'])
+    return redirect('posts:follow_index')
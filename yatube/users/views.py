@@ -1,3 +1,5 @@
+from django.contrib.auth import login
+from django.shortcuts import redirect
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
 
@@ -5,6 +7,13 @@ from .forms import CreationForm
 
 
 class SignUp(CreateView):
+    """После регистрации сразу входит и предлагает подписаться на авторов."""
+
     form_class = CreationForm
-    success_url = reverse_lazy('posts:index')
+    success_url = reverse_lazy('posts:follow_suggestions')
     template_name = 'users/signup.html'
+
+    def form_valid(self, form):
+        user = form.save()
+        login(self.request, user)
+        return redirect(self.success_url)
@@ -0,0 +1,28 @@
+"""
+Settings profile is chosen by the DJANGO_ENV environment variable:
+dev (default), test or prod. Each profile extends settings/base.py.
+
+Test runs select the test profile by default: manage.py test sets
+DJANGO_ENV itself, py.test is recognised by its loaded module because
+pytest-django imports settings before any conftest.py is read.
+"""
+
+import os
+import sys
+
+DJANGO_ENV = os.getenv(
+    'DJANGO_ENV', 'test' if 'pytest' in sys.modules else 'dev'
+)
+
+if DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == 'test':
+    from .test import *  # noqa: F401,F403
+elif DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    from django.core.exceptions import ImproperlyConfigured
+
+    raise ImproperlyConfigured(
+        f'Unknown DJANGO_ENV={DJANGO_ENV!r}, use dev, test or prod'
+    )
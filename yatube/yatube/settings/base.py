@@ -0,0 +1,246 @@
+"""
+Django settings for yatube project shared by all profiles.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+from core.cache_url import cache_from_url
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv(
+    'SECRET_KEY', '5y!wqk&)-tqm5z8%5$m=@p2mo*h**q_!rc!z_ga#b8mmek5b6p'
+)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+    'www.mtestproject.pythonanywhere.com',
+    'mtestproject.pythonanywhere.com',
+]
+
+# Constants for testing paginator
+POSTS_ON_PAGE = 10
+# Cached feed counters: lifetime and the limit of the exact COUNT(*)
+FEED_COUNT_TIMEOUT = 60 * 60
+FEED_COUNT_EXACT_LIMIT = 10000
+# Feed fragments are invalidated by generation counters, not by TTL
+FEED_CACHE_TIMEOUT = 60 * 60
+# How long shared caches may serve anonymous feed pages before revalidating
+PAGE_CACHE_MAX_AGE = 30
+# Server-side cache of whole anonymous-shaped pages, keyed by feed generation
+PAGE_CACHE_TIMEOUT = 60 * 60
+# Follow timeline: authors with more followers are merged at read time,
+# fan-out insert batch size and how many posts a new follow backfills
+TIMELINE_FANOUT_LIMIT = 10000
+TIMELINE_BATCH_SIZE = 1000
+TIMELINE_BACKFILL = 1000
+# Background pool for post images; 0 processes them in the calling thread
+POST_IMAGE_WORKERS = int(os.getenv('POST_IMAGE_WORKERS', 2))
+# Responsive image derivatives; formats Pillow cannot write are skipped,
+# JPEG stays as the fallback for <img src>
+POST_IMAGE_WIDTHS = (320, 640, 960, 1920)
+POST_IMAGE_FORMATS = ('AVIF', 'WEBP', 'JPEG')
+POST_IMAGE_QUALITY = 80
+# Uploads are streamed into MEDIA_ROOT/FILE_UPLOAD_INCOMING_DIR and moved
+# into place on save; files over FILE_UPLOAD_MAX_SIZE bytes are rejected
+FILE_UPLOAD_HANDLERS = ('posts.uploads.StreamingUploadHandler',)
+FILE_UPLOAD_INCOMING_DIR = 'incoming'
+FILE_UPLOAD_MAX_SIZE = int(os.getenv('FILE_UPLOAD_MAX_SIZE', 10 * 1024 ** 2))
+# Latest comments shown under each feed post, 0 turns the preview off
+FEED_COMMENTS_PREVIEW = 3
+# Follow graph: cached followee arrays and follower counts (posts.follow_graph)
+FOLLOW_GRAPH_TIMEOUT = 60 * 60 * 24
+# Bulk follow: authors per request, authors suggested after signup
+FOLLOW_BULK_LIMIT = 100
+FOLLOW_SUGGESTIONS = 20
+# Offline "who to follow" (posts.recommendations): authors stored per user,
+# authors shown on a page, similar users taken into account and the weights
+# of the friends-of-friends, co-followed and group activity signals
+RECOMMENDATIONS_PER_USER = 20
+RECOMMENDATIONS_SHOWN = 5
+RECOMMENDATION_NEIGHBOURS = 50
+RECOMMENDATION_WEIGHTS = {'friends': 1.0, 'co_followed': 1.0, 'groups': 0.5}
+# Bulk admin moderation: rows per batch, counters and caches are updated
+# once per batch
+MODERATION_BATCH_SIZE = 1000
+# Search index: rows per bulk insert while indexing
+SEARCH_BATCH_SIZE = 1000
+# Constant for CSRF token check
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+# Paths for media
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Cache. LocMemCache is per process, so with several workers set a shared
+# backend, e.g. CACHE_URL=file:///var/tmp/yatube_cache or db://yatube_cache
+# (SQLite, run manage.py createcachetable) or memcached://127.0.0.1:11211.
+# CACHE_KEY_PREFIX separates deployments that share one cache server.
+CACHES = {
+    'default': cache_from_url(
+        os.getenv('CACHE_URL', 'locmem://'),
+        key_prefix=os.getenv('CACHE_KEY_PREFIX', 'yatube'),
+    )
+}
+# Stampede protection: lock lifetime and early recompute aggressiveness
+CACHE_LOCK_TIMEOUT = 10
+CACHE_EARLY_RECOMPUTE_BETA = 1.0
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv(
+            'DATABASE_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+    }
+}
+
+# Read replicas for read-only feed views (core.replicas). A local replica
+# is another SQLite file refreshed by manage.py sync_replica. After a
+# write the user reads from the primary for REPLICA_PIN_SECONDS
+DATABASE_REPLICAS = []
+if os.getenv('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DATABASE_REPLICA_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append('replica')
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+REPLICA_PIN_COOKIE = 'primary_db'
+REPLICA_PIN_SECONDS = 10
+
+# PRAGMAs for every new SQLite connection (core.sqlite). WAL lets readers
+# work alongside the writer, writers wait busy_timeout ms for the lock
+# instead of failing with "database is locked"; cache_size is in KiB
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -int(os.getenv('SQLITE_CACHE_KB', 16 * 1024)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 64 * 1024 ** 2)),
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru-ru'
+
+TIME_ZONE = 'Europe/Moscow'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
@@ -0,0 +1,16 @@
+"""Local development: DEBUG and django-debug-toolbar."""
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = True
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+# IP адреса, при обращении с которых будет доступен DjDT
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
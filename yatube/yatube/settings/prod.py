@@ -0,0 +1,41 @@
+"""
+Production: no debug tooling, persistent DB connections and templates
+compiled once per process (wsgi.py pre-warms them, see
+core.template_warmup).
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, DATABASES, SQLITE_PRAGMAS, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.getenv('SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Set SECRET_KEY for DJANGO_ENV=prod')
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)).split(',')
+
+# Keep connections open between requests instead of reconnecting each time
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', 600))
+
+SQLITE_PRAGMAS = {
+    **SQLITE_PRAGMAS,
+    'cache_size': -int(os.getenv('SQLITE_CACHE_KB', 64 * 1024)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 ** 2)),
+}
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [(
+    'django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ],
+)]
+TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+    'django.template.context_processors.debug'
+)
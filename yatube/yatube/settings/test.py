@@ -0,0 +1,17 @@
+"""Test runs: no debug tooling, images processed inline, fast hashing."""
+
+from .base import *  # noqa: F401,F403
+from .base import SQLITE_PRAGMAS
+
+DEBUG = False
+
+# Images are processed in the test thread, not in a background pool
+POST_IMAGE_WORKERS = 0
+
+# Tests run against the primary only
+DATABASE_REPLICAS = []
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# The test database is thrown away, durability does not matter
+SQLITE_PRAGMAS = {**SQLITE_PRAGMAS, 'synchronous': 'OFF'}